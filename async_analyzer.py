@@ -0,0 +1,89 @@
+"""
+Clasificación desde asyncio, sin bloquear el event loop.
+
+    async for entrada, resultado in classify_many(rutas, concurrency=8):
+        ...
+
+Los archivos se leen en el executor por defecto del loop (hilos) y el
+trabajo de Scanner + Parser (classify) corre en `executor`: por defecto
+también hilos, o un ProcessPoolExecutor para usar varios núcleos. Los
+resultados salen en orden de finalización y nunca hay más de
+`concurrency` entradas en vuelo, así que un consumidor lento frena la
+lectura de entradas (backpressure).
+"""
+
+import asyncio
+import os
+
+from syntax_analyzer import classify
+
+
+def leer_archivo(ruta):
+    with open(ruta, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+async def _como_async(entradas):
+    for entrada in entradas:
+        yield entrada
+
+
+async def clasificar_entrada(entrada, texts, executor, engine):
+    """Result de una ruta (o de un texto si `texts` y es un str)"""
+    loop = asyncio.get_running_loop()
+    if texts and isinstance(entrada, str):
+        texto = entrada
+    else:
+        texto = await loop.run_in_executor(None, leer_archivo, os.fspath(entrada))
+    return await loop.run_in_executor(executor, classify, texto, engine)
+
+
+async def classify_many(paths_or_texts, concurrency=8, *, texts=False, executor=None,
+                        engine="dfa", return_exceptions=False):
+    """
+    Genera pares (entrada, Result) en orden de finalización.
+
+    `paths_or_texts` es un iterable normal o asíncrono. Cada entrada es una
+    ruta (str u os.PathLike); con texts=True los str son código fuente y
+    las rutas se pasan como os.PathLike (p. ej. pathlib.Path). Si una
+    entrada falla (p. ej. un archivo que no existe) se propaga la
+    excepción, o con return_exceptions=True se genera en lugar del Result.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency debe ser al menos 1")
+
+    if hasattr(paths_or_texts, "__aiter__"):
+        entradas = paths_or_texts.__aiter__()
+    else:
+        entradas = _como_async(paths_or_texts)
+
+    pendientes = {}
+    agotadas = False
+    try:
+        while True:
+            while not agotadas and len(pendientes) < concurrency:
+                try:
+                    entrada = await entradas.__anext__()
+                except StopAsyncIteration:
+                    agotadas = True
+                    break
+                tarea = asyncio.ensure_future(
+                    clasificar_entrada(entrada, texts, executor, engine))
+                pendientes[tarea] = entrada
+
+            if not pendientes:
+                return
+
+            listas, _ = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+            for tarea in listas:
+                entrada = pendientes.pop(tarea)
+                error = tarea.exception()
+                if error is None:
+                    yield entrada, tarea.result()
+                elif return_exceptions:
+                    yield entrada, error
+                else:
+                    raise error
+    finally:
+        for tarea in pendientes:
+            tarea.cancel()
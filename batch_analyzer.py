@@ -0,0 +1,261 @@
+"""
+Clasificación por lotes en paralelo.
+
+Uso: python batch_analyzer.py [--workers N] [--timeout S] [-o salida.jsonl]
+                              [--cache RUTA [--cache-tokens] | --symbols RUTA]
+                              <directorio|glob|archivo|@lista> ...
+
+Los archivos se reparten entre un ProcessPoolExecutor y cada resultado se
+escribe como una línea JSON (path, paradigm, certainty, read, elapsed) en
+cuanto termina. Un archivo que falla o excede el tiempo límite produce una
+línea con "error" y el lote continúa; si muere un worker (p. ej. por el OOM
+killer), los archivos en vuelo en el pool dan una línea con "error" y el
+lote sigue en un pool nuevo. Con --cache, los archivos sin
+cambios se resuelven desde la caché de resultados (result_cache.py).
+
+Los archivos se clasifican sin tabla de símbolos. Con --symbols cada
+worker comparte una sola tabla (SymbolTable) entre todos sus archivos y
+se vuelca una vez al terminar el lote. --symbols no se combina con
+--cache: un acierto de la caché no escanea el archivo y sus nombres
+faltarían en la tabla.
+"""
+
+import argparse
+import glob
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing.util import Finalize
+
+from lexical_analyzer import SymbolTable
+from result_cache import ResultCache
+from syntax_analyzer import analizar_archivo, tokens_de_archivo
+
+# Tareas en vuelo por worker: acota la memoria con millones de archivos
+TAREAS_POR_WORKER = 4
+
+# Caché abierta en este proceso (una conexión por worker)
+_caches = {}
+
+# Tabla de símbolos compartida por todos los archivos de este proceso
+# (solo con --symbols)
+_simbolos = None
+
+
+class TiempoAgotado(BaseException):
+    """
+    Tiempo límite de un archivo. Hereda de BaseException para que el
+    fallback de classify() y compañía (except Exception) no lo convierta en TEXT.
+    """
+
+
+@contextmanager
+def limite_de_tiempo(segundos):
+    """Interrumpe el bloque tras `segundos` (sin efecto si no hay SIGALRM)"""
+    if not segundos or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def expirar(signum, frame):
+        raise TiempoAgotado(f"excedió {segundos} s")
+
+    anterior = signal.signal(signal.SIGALRM, expirar)
+    signal.setitimer(signal.ITIMER_REAL, segundos)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, anterior)
+
+
+def expandir_entradas(entradas):
+    """
+    Genera las rutas de archivo de cada entrada: directorios (recursivo),
+    globs, listas "@archivo" (una ruta por línea, "@-" para stdin) o rutas
+    sueltas. No construye la lista completa.
+    """
+    for entrada in entradas:
+        if entrada.startswith("@"):
+            lista = sys.stdin if entrada == "@-" else open(entrada[1:], encoding="utf-8")
+            with lista:
+                for linea in lista:
+                    ruta = linea.strip()
+                    if ruta:
+                        yield ruta
+        elif os.path.isdir(entrada):
+            for raiz, directorios, archivos in os.walk(entrada):
+                directorios.sort()
+                for nombre in sorted(archivos):
+                    yield os.path.join(raiz, nombre)
+        elif glob.has_magic(entrada):
+            for ruta in sorted(glob.iglob(entrada, recursive=True)):
+                if os.path.isfile(ruta):
+                    yield ruta
+        else:
+            yield entrada
+
+
+def clasificar_stream(ruta):
+    """
+    Clasifica un archivo leyéndolo por bloques (analizar_archivo), sin
+    atrapar errores: un archivo ilegible da un registro con "error" y no
+    se guarda en la caché
+    """
+    return analizar_archivo(ruta, symbols=_simbolos)
+
+
+def iniciar_worker(ruta_simbolos):
+    """Crea la tabla del worker y programa su volcado a RUTA.<pid> al salir"""
+    global _simbolos
+    if ruta_simbolos:
+        _simbolos = SymbolTable()
+        parte = f"{ruta_simbolos}.{os.getpid()}"
+        Finalize(_simbolos, _simbolos.dump, args=(parte,), exitpriority=10)
+
+
+def unir_tablas(ruta_simbolos):
+    """Une las tablas volcadas por los workers en un solo archivo"""
+    tabla = SymbolTable()
+    for parte in sorted(glob.glob(glob.escape(ruta_simbolos) + ".[0-9]*")):
+        for nombre in SymbolTable.load(parte):
+            tabla.intern(nombre)
+        os.remove(parte)
+    tabla.dump(ruta_simbolos)
+    return tabla
+
+
+def cache_del_proceso(ruta_cache):
+    """Abre (una vez por proceso) la caché en `ruta_cache`"""
+    if ruta_cache not in _caches:
+        _caches[ruta_cache] = ResultCache(ruta_cache)
+    return _caches[ruta_cache]
+
+
+def clasificar_archivo(ruta, timeout=None, ruta_cache=None, cache_tokens=False):
+    """Clasifica un archivo y devuelve su registro JSON (con error si falla)"""
+    inicio = time.perf_counter()
+    registro = {"path": ruta}
+    try:
+        with limite_de_tiempo(timeout):
+            if ruta_cache:
+                tokens = tokens_de_archivo if cache_tokens else None
+                resultado = cache_del_proceso(ruta_cache).clasificar(
+                    ruta, clasificar_stream, tokens)
+            else:
+                resultado = clasificar_stream(ruta)
+        paradigma, certeza, lectura = resultado
+        registro.update(paradigm=paradigma, certainty=certeza, read=lectura)
+    except (Exception, TiempoAgotado) as error:
+        registro["error"] = f"{type(error).__name__}: {error}"
+    registro["elapsed"] = round(time.perf_counter() - inicio, 6)
+    return registro
+
+
+def crear_pool(workers, ruta_simbolos):
+    """Pool de procesos del lote, con la tabla de símbolos de cada worker"""
+    return ProcessPoolExecutor(max_workers=workers, initializer=iniciar_worker,
+                               initargs=(ruta_simbolos,))
+
+
+def registros_listos(listos, pendientes):
+    """
+    Registros de las tareas terminadas, que salen de `pendientes`. Una
+    tarea de un pool roto (murió un worker) da un registro con "error"
+    """
+    for futuro in listos:
+        ruta, inicio = pendientes.pop(futuro)
+        try:
+            yield futuro.result()
+        except BrokenProcessPool as error:
+            yield {"path": ruta, "error": f"{type(error).__name__}: {error}",
+                   "elapsed": round(time.perf_counter() - inicio, 6)}
+
+
+def clasificar_lote(rutas, workers=None, timeout=None, ruta_cache=None,
+                    cache_tokens=False, ruta_simbolos=None):
+    """
+    Clasifica las rutas en un pool de procesos y genera los registros en
+    orden de finalización. Solo mantiene workers * TAREAS_POR_WORKER
+    tareas en vuelo, así que `rutas` puede ser un generador muy largo.
+    Si muere un worker, las tareas en vuelo de su pool dan un registro
+    con "error" y el lote sigue en un pool nuevo. Con `ruta_simbolos`, al
+    terminar escribe allí la tabla de símbolos del lote (sin los nombres
+    de los workers de un pool roto, que no llegan a volcarla); no se
+    combina con `ruta_cache` (ValueError).
+    """
+    if ruta_cache and ruta_simbolos:
+        raise ValueError("La tabla de símbolos del lote no se puede combinar con la caché")
+    workers = workers or os.cpu_count() or 1
+    limite = workers * TAREAS_POR_WORKER
+
+    pool = crear_pool(workers, ruta_simbolos)
+    pendientes = {}  # futuro -> (ruta, inicio)
+    try:
+        for ruta in rutas:
+            if len(pendientes) >= limite:
+                listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                yield from registros_listos(listos, pendientes)
+            tarea = (clasificar_archivo, ruta, timeout, ruta_cache, cache_tokens)
+            try:
+                futuro = pool.submit(*tarea)
+            except BrokenProcessPool:
+                # Las tareas del pool roto ya terminaron con error
+                pool.shutdown(wait=False)
+                pool = crear_pool(workers, ruta_simbolos)
+                futuro = pool.submit(*tarea)
+            pendientes[futuro] = (ruta, time.perf_counter())
+
+        while pendientes:
+            listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            yield from registros_listos(listos, pendientes)
+    finally:
+        pool.shutdown()
+
+    # Los workers ya terminaron y volcaron sus tablas
+    if ruta_simbolos:
+        unir_tablas(ruta_simbolos)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        prog="batch_analyzer.py",
+        description="Clasifica muchos archivos en paralelo (salida JSONL)",
+    )
+    arg_parser.add_argument("entradas", nargs="+",
+                            help="directorios, globs, archivos o @lista")
+    arg_parser.add_argument("-w", "--workers", type=int, default=None,
+                            help="procesos del pool (por defecto, núcleos)")
+    arg_parser.add_argument("-t", "--timeout", type=float, default=None,
+                            help="segundos máximos por archivo")
+    arg_parser.add_argument("-o", "--output", default="-",
+                            help="archivo JSONL de salida (- para stdout)")
+    arg_parser.add_argument("--cache", default=None,
+                            help="base de datos de la caché de resultados")
+    arg_parser.add_argument("--cache-tokens", action="store_true",
+                            help="guardar también el stream de tokens en la caché")
+    arg_parser.add_argument("--symbols", default=None,
+                            help="archivo donde volcar la tabla de símbolos del lote")
+    args = arg_parser.parse_args()
+    if args.cache and args.symbols:
+        arg_parser.error("--symbols no se puede combinar con --cache")
+
+    salida = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        rutas = expandir_entradas(args.entradas)
+        registros = clasificar_lote(rutas, args.workers, args.timeout,
+                                    args.cache, args.cache_tokens, args.symbols)
+        for registro in registros:
+            salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            salida.flush()
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Puntuación vectorizada de muchos análisis a la vez.
+
+Los workers solo tienen que devolver los Contadores de cada archivo
+(Puntuacion.contadores()); puntuar_lote() calcula paradigma, certeza y %
+de lectura de todos ellos con NumPy, con los mismos resultados que
+Puntuacion.clasificar_mejor_match() archivo a archivo. Así un corpus
+entero se vuelve a puntuar sin volver a analizarlo.
+"""
+
+from syntax_analyzer import RESULTADO_VACIO, Contadores, Result
+
+try:
+    import numpy as np
+except ImportError:  # opcional: solo la puntuación por lotes lo necesita
+    np = None
+
+# Paradigma según (clases > 0) + 2 * (funciones > 0)
+PARADIGMAS = ("TEXT", "OOP", "PP", "HYB")
+
+# Distancia a un .5 por debajo de la cual se redondea como round()
+_TOLERANCIA_REDONDEO = 1e-6
+
+
+def columnas(contadores):
+    """Una secuencia de Contadores como un array por campo"""
+    filas = list(contadores)
+    if not filas:
+        return {campo: np.zeros(0) for campo in Contadores._fields}
+    datos = np.array(filas, dtype=np.float64)
+    return {campo: datos[:, i] for i, campo in enumerate(Contadores._fields)}
+
+
+def redondear(valores):
+    """round(x, 1) elemento a elemento, con el resultado exacto de Python"""
+    resultado = np.round(valores, 1)
+    # np.round escala por 10 y puede errar en los casos justo en un .5
+    decimas = valores * 10
+    dudosos = np.flatnonzero(
+        np.abs(decimas - np.floor(decimas) - 0.5) < _TOLERANCIA_REDONDEO)
+    for i in dudosos.tolist():
+        resultado[i] = round(float(valores[i]), 1)
+    return resultado
+
+
+def puntuar_lote(contadores):
+    """
+    Paradigmas, certezas y % de lectura de una secuencia de Contadores (o
+    de un dict de columnas como el de columnas()), como tres arrays
+    """
+    if np is None:
+        raise ImportError("La puntuación por lotes requiere NumPy")
+    if not isinstance(contadores, dict):
+        contadores = columnas(contadores)
+
+    clases = np.asarray(contadores["clases"], dtype=np.float64)
+    funciones = np.asarray(contadores["funciones"], dtype=np.float64)
+    procesados = np.asarray(contadores["procesados"], dtype=np.float64)
+    programacion = np.asarray(contadores["programacion"], dtype=np.float64)
+    errores = np.asarray(contadores["errores"], dtype=np.float64)
+    total = np.asarray(contadores["total"], dtype=np.float64)
+    leidos = np.asarray(contadores["leidos"], dtype=np.float64)
+    fraccion = np.asarray(contadores.get("fraccion", 1.0), dtype=np.float64)
+
+    codigo = (clases > 0).astype(np.intp) + 2 * (funciones > 0)
+    paradigmas = np.array(PARADIGMAS)[codigo]
+
+    vacio = total == 0
+    divisor = np.where(vacio, 1.0, total)
+
+    # Mismos factores y mismo orden de operaciones que calcular_certeza()
+    ratio_procesados = np.minimum(procesados / divisor, 1.0)
+    factor_procesado = ratio_procesados * 40
+
+    caracteristicas = clases + funciones
+    base = np.maximum(caracteristicas, 1)
+    factor_caracteristicas = np.select(
+        [codigo == 1, codigo == 2, codigo == 3],
+        [np.minimum((clases / base) * 35, 35),
+         np.minimum((funciones / base) * 35, 35),
+         (np.minimum(clases, funciones) / base) * 35],
+        default=25.0,
+    )
+
+    factor_coherencia = np.maximum(5, 15 - (errores * 1.5))
+    factor_densidad = (programacion / divisor) * 10
+
+    certeza = factor_procesado + factor_caracteristicas + factor_coherencia + factor_densidad
+    texto = codigo == 0
+    certeza = np.where(texto & (ratio_procesados < 0.3),
+                       np.minimum(certeza + 10, 85), certeza)
+    certezas = np.clip(np.rint(certeza), 15, 90).astype(np.int64)
+
+    lectura = (leidos / divisor) * 100 * fraccion
+    lecturas = np.minimum(redondear(lectura), 100.0)
+
+    paradigmas[vacio] = RESULTADO_VACIO.paradigm
+    certezas[vacio] = RESULTADO_VACIO.certainty
+    lecturas[vacio] = RESULTADO_VACIO.read
+
+    return paradigmas, certezas, lecturas
+
+
+def resultados(contadores):
+    """Result de cada elemento de puntuar_lote(), en el mismo orden"""
+    paradigmas, certezas, lecturas = puntuar_lote(contadores)
+    return [
+        Result(paradigma, certeza, lectura)
+        for paradigma, certeza, lectura in zip(
+            paradigmas.tolist(), certezas.tolist(), lecturas.tolist())
+    ]
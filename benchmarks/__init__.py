@@ -0,0 +1,5 @@
+"""
+Benchmarks del scanner y del parser sobre un corpus sintético.
+
+Uso: python -m benchmarks.run [--size N] [--seed S] [-o resultados.json]
+"""
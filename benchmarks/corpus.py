@@ -0,0 +1,90 @@
+"""
+Generador de corpus sintético con semilla.
+
+Cada generador recibe un random.Random y un número aproximado de tokens y
+devuelve el texto; la misma semilla produce siempre el mismo corpus.
+"""
+
+import random
+
+PALABRAS = (
+    "the of and to in is that for it as with was on be by this are from "
+    "or have an they which one you were all we can her has there been if"
+).split()
+
+
+def identificador(rng, largo=None):
+    """Identificador de `largo` caracteres (entre 1 y 12 por defecto)"""
+    largo = largo or rng.randint(1, 12)
+    primero = rng.choice("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+    resto = "abcdefghijklmnopqrstuvwxyz0123456789_"
+    return primero + "".join(rng.choice(resto) for _ in range(largo - 1))
+
+
+def clases_anidadas(rng, tokens, profundidad=200):
+    """Bloques de clases anidadas `profundidad` niveles, uno tras otro"""
+    partes = []
+    total = 0
+    while total < tokens:
+        nivel = rng.randint(1, profundidad)
+        partes.append(" ".join(f"class {identificador(rng)} {{" for _ in range(nivel)))
+        partes.append(identificador(rng))
+        partes.append(" }" * nivel)
+        total += 4 * nivel + 1
+    return " ".join(partes)
+
+
+def funciones_planas(rng, tokens):
+    """Una lista enorme de funciones al mismo nivel: f ( a b ) { c }"""
+    partes = []
+    total = 0
+    while total < tokens:
+        params = " ".join(identificador(rng) for _ in range(rng.randint(0, 3)))
+        cuerpo = " ".join(identificador(rng) for _ in range(rng.randint(0, 3)))
+        partes.append(f"{identificador(rng)} ( {params} ) {{ {cuerpo} }}")
+        total += 5 + params.count(" ") + cuerpo.count(" ") + 2
+    return "\n".join(partes)
+
+
+def identificadores_largos(rng, tokens, largo=200):
+    """Funciones cuyos identificadores tienen `largo` caracteres"""
+    partes = []
+    for _ in range(max(1, tokens // 6)):
+        nombre, param, cuerpo = (identificador(rng, largo) for _ in range(3))
+        partes.append(f"{nombre} ( {param} ) {{ {cuerpo} }}")
+    return "\n".join(partes)
+
+
+def prosa(rng, tokens):
+    """Texto en lenguaje natural: solo identificadores y puntuación"""
+    lineas = []
+    for _ in range(max(1, tokens // 12)):
+        frase = " ".join(rng.choice(PALABRAS) for _ in range(12))
+        lineas.append(frase.capitalize() + ".")
+    return "\n".join(lineas)
+
+
+def malformado(rng, tokens):
+    """Código con llaves y paréntesis sueltos que fuerza el recovery"""
+    simbolos = ("(", ")", "{", "}", "class")
+    partes = []
+    for _ in range(tokens):
+        if rng.random() < 0.4:
+            partes.append(rng.choice(simbolos))
+        else:
+            partes.append(identificador(rng))
+    return " ".join(partes)
+
+
+CORPUS = {
+    "nested_classes": clases_anidadas,
+    "flat_functions": funciones_planas,
+    "long_identifiers": identificadores_largos,
+    "prose": prosa,
+    "malformed": malformado,
+}
+
+
+def generar(nombre, tokens, seed=0):
+    """Texto del corpus `nombre` con unos `tokens` tokens"""
+    return CORPUS[nombre](random.Random(f"{seed}:{nombre}"), tokens)
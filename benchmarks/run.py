@@ -0,0 +1,172 @@
+"""
+Mide el scanner, el parser y la clasificación completa sobre cada corpus.
+
+Por corpus se reportan tokens/s de Scanner.scan (por motor), el tiempo de
+RecursiveDescentParser.parse (por motor, sobre tokens ya escaneados), la
+latencia de classify() y su pico de memoria (tracemalloc), y los tokens del
+parser con el scanner en --workers procesos. Los tiempos son el mejor de
+--repeat ejecuciones; los resultados se escriben en JSON.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import CORPUS, generar
+from lexical_analyzer import ENGINES, Scanner, np
+from syntax_analyzer import (
+    PARSER_ENGINES, RecursiveDescentParser, TokenStore, classify,
+    tokens_desde_scanner,
+)
+
+
+def cronometrar(funcion, repeticiones):
+    """Mejor y media de `repeticiones` llamadas a `funcion`, en segundos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), sum(tiempos) / len(tiempos)
+
+
+def medir_scanner(texto, engine, repeticiones):
+    tokens = sum(1 for _ in Scanner(texto, engine=engine).tokens())
+    mejor, media = cronometrar(
+        lambda: Scanner(texto, emit=lambda _: None, engine=engine).scan(), repeticiones)
+    return {
+        "tokens": tokens,
+        "seconds": mejor,
+        "mean_seconds": media,
+        "tokens_per_sec": tokens / mejor if mejor else None,
+    }
+
+
+def medir_parser(store, engine, repeticiones):
+    try:
+        mejor, media = cronometrar(
+            lambda: RecursiveDescentParser(store, engine).parse(), repeticiones)
+    except RecursionError as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+    return {
+        "seconds": mejor,
+        "mean_seconds": media,
+        "tokens_per_sec": len(store) / mejor if mejor else None,
+    }
+
+
+def medir_paralelo(texto, workers, repeticiones):
+    """Tokens del parser con el scanner en `workers` procesos y en uno solo"""
+    def contar(procesos):
+        return sum(1 for _ in tokens_desde_scanner(Scanner(texto, workers=procesos)))
+
+    serie, _ = cronometrar(lambda: contar(1), repeticiones)
+    mejor, media = cronometrar(lambda: contar(workers), repeticiones)
+    return {
+        "workers": workers,
+        "seconds": mejor,
+        "mean_seconds": media,
+        "serial_seconds": serie,
+        "speedup": serie / mejor if mejor else None,
+    }
+
+
+def medir_memoria(texto):
+    """Pico de memoria asignada (bytes) durante classify(texto)"""
+    tracemalloc.start()
+    try:
+        classify(texto)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico
+
+
+def medir_corpus(nombre, tokens, seed, repeticiones, engines, workers=None):
+    texto = generar(nombre, tokens, seed)
+    store = TokenStore(tokens_desde_scanner(Scanner(texto)))
+
+    e2e_mejor, e2e_media = cronometrar(lambda: classify(texto), repeticiones)
+    informe = {
+        "corpus": nombre,
+        "chars": len(texto),
+        "tokens": len(store),
+        "result": list(classify(texto)),
+        "scan": {e: medir_scanner(texto, e, repeticiones) for e in engines},
+        "parse": {e: medir_parser(store, e, repeticiones) for e in PARSER_ENGINES},
+        "end_to_end": {"seconds": e2e_mejor, "mean_seconds": e2e_media},
+        "peak_memory_bytes": medir_memoria(texto),
+    }
+    if workers is not None and workers > 1:
+        informe["parallel"] = medir_paralelo(texto, workers, repeticiones)
+    return informe
+
+
+def imprimir_resumen(resultados, salida=sys.stdout):
+    for r in resultados:
+        scan = ", ".join(f"{e} {m['tokens_per_sec']:,.0f} tok/s"
+                         for e, m in r["scan"].items())
+        parse = ", ".join(f"{e} {m['seconds']:.3f} s" if "seconds" in m else f"{e} error"
+                          for e, m in r["parse"].items())
+        paralelo = ""
+        if "parallel" in r:
+            p = r["parallel"]
+            paralelo = f" | {p['workers']} workers {p['seconds']:.3f} s (x{p['speedup']:.2f})"
+        print(f"{r['corpus']:<18} {r['tokens']:>9,} tokens | scan: {scan} | "
+              f"parse: {parse} | e2e {r['end_to_end']['seconds']:.3f} s | "
+              f"pico {r['peak_memory_bytes'] / 1024:,.0f} KiB{paralelo}", file=salida)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmarks del scanner y el parser (salida JSON)",
+    )
+    arg_parser.add_argument("--size", type=int, default=100_000,
+                            help="tokens aproximados por corpus")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--repeat", type=int, default=3,
+                            help="ejecuciones por medida (se toma la mejor)")
+    arg_parser.add_argument("--corpus", action="append", choices=sorted(CORPUS),
+                            help="corpus a medir (por defecto, todos)")
+    arg_parser.add_argument("--engine", action="append", choices=ENGINES,
+                            help="motores del scanner (por defecto, todos)")
+    arg_parser.add_argument("--workers", type=int, default=2,
+                            help="procesos del scanner paralelo (1 para no medirlo)")
+    arg_parser.add_argument("-o", "--output", default="benchmark_results.json",
+                            help="archivo JSON de resultados (- para stdout)")
+    args = arg_parser.parse_args()
+
+    engines = args.engine or [e for e in ENGINES if e != "numpy" or np is not None]
+    resultados = [
+        medir_corpus(nombre, args.size, args.seed, args.repeat, engines, args.workers)
+        for nombre in args.corpus or CORPUS
+    ]
+    informe = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "numpy": np.__version__ if np is not None else None,
+            "size": args.size,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "workers": args.workers,
+        },
+        "results": resultados,
+    }
+
+    if args.output == "-":
+        json.dump(informe, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2)
+        imprimir_resumen(resultados)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cliente del servidor de clasificación (classifier_server.py).
+
+Uso: python classifier_client.py [--socket RUTA | --tcp [HOST:]PUERTO] <archivo>
+     python classifier_client.py [--socket RUTA | --tcp [HOST:]PUERTO] --text CODIGO
+
+Imprime la misma línea que syntax_analyzer.py (PARADIGMA certeza lectura).
+Solo importa la biblioteca estándar para arrancar rápido.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+
+SOCKET_POR_DEFECTO = os.path.join(tempfile.gettempdir(), "clasificador.sock")
+HOST_POR_DEFECTO = "127.0.0.1"
+
+
+def direccion_tcp(valor):
+    """Convierte "HOST:PUERTO" o "PUERTO" en (host, puerto)"""
+    host, _, puerto = valor.rpartition(":")
+    return host or HOST_POR_DEFECTO, int(puerto)
+
+
+def conectar(socket_unix=None, tcp=None, timeout=60.0):
+    """Abre una conexión al servidor (socket Unix por defecto)"""
+    if tcp is not None:
+        return socket.create_connection(tcp, timeout=timeout)
+    conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conexion.settimeout(timeout)
+    try:
+        conexion.connect(socket_unix or SOCKET_POR_DEFECTO)
+    except OSError:
+        conexion.close()
+        raise
+    return conexion
+
+
+def consultar(peticion, socket_unix=None, tcp=None, timeout=60.0):
+    """Envía una petición (dict) y devuelve la respuesta del servidor"""
+    with conectar(socket_unix, tcp, timeout) as conexion:
+        conexion.sendall(json.dumps(peticion, ensure_ascii=False).encode("utf-8") + b"\n")
+        with conexion.makefile("rb") as respuesta:
+            linea = respuesta.readline()
+    if not linea:
+        raise ConnectionError("El servidor cerró la conexión sin responder")
+    return json.loads(linea)
+
+
+def linea_resultado(respuesta):
+    """La línea que imprimiría syntax_analyzer.py para esta respuesta"""
+    if "error" in respuesta:
+        return "Error al procesar el archivo"
+    return f"{respuesta['paradigm']} {respuesta['certainty']} {respuesta['read']}"
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python classifier_client.py [--socket RUTA | --tcp [HOST:]PUERTO] "
+              "<archivo> | --text CODIGO")
+        sys.exit(0)
+
+    arg_parser = argparse.ArgumentParser(prog="classifier_client.py")
+    arg_parser.add_argument("archivo_entrada", nargs="?")
+    arg_parser.add_argument("--text", default=None, help="código a clasificar")
+    destino = arg_parser.add_mutually_exclusive_group()
+    destino.add_argument("--socket", default=None,
+                         help=f"socket Unix del servidor ({SOCKET_POR_DEFECTO})")
+    destino.add_argument("--tcp", type=direccion_tcp, default=None,
+                         help="dirección TCP del servidor, [HOST:]PUERTO")
+    args = arg_parser.parse_args()
+
+    if args.text is not None:
+        peticion = {"text": args.text}
+    elif args.archivo_entrada:
+        # El servidor puede tener otro directorio de trabajo
+        peticion = {"path": os.path.abspath(args.archivo_entrada)}
+    else:
+        arg_parser.error("falta el archivo de entrada o --text")
+
+    try:
+        respuesta = consultar(peticion, args.socket, args.tcp)
+    except OSError as error:
+        print(f"Servidor de clasificación no disponible: {error}", file=sys.stderr)
+        sys.exit(1)
+
+    print(linea_resultado(respuesta))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Servidor de clasificación: carga el analizador una sola vez y atiende
+peticiones sobre un socket Unix o TCP local, sin arrancar un intérprete
+por archivo.
+
+Uso: python classifier_server.py [--socket RUTA | --tcp [HOST:]PUERTO]
+                                 [--workers N] [--timeout S] [--cache RUTA]
+
+Protocolo: un objeto JSON por línea, en ambos sentidos. Una petición trae
+"path" (ruta absoluta de un archivo de código o de salida del scanner) o
+"text" (código en línea), y opcionalmente "id" y "engine". La respuesta
+trae paradigm, certainty, read y elapsed, o "error", además del "id".
+Cada conexión se atiende en un hilo y la clasificación corre en un pool de
+procesos.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+
+from batch_analyzer import TiempoAgotado, cache_del_proceso, limite_de_tiempo
+from classifier_client import SOCKET_POR_DEFECTO, direccion_tcp
+from lexical_analyzer import ENGINES
+from syntax_analyzer import clasificar_ruta, clasificar_texto
+
+# Tamaño máximo de una petición (una línea JSON)
+LIMITE_PETICION = 64 << 20
+
+
+def atender(peticion, timeout=None, ruta_cache=None):
+    """Clasifica una petición en un worker y devuelve la respuesta"""
+    inicio = time.perf_counter()
+    respuesta = {"id": peticion["id"]} if "id" in peticion else {}
+    try:
+        with limite_de_tiempo(timeout):
+            if "text" in peticion:
+                engine = peticion.get("engine", "dfa")
+                if engine not in ENGINES:
+                    raise ValueError(f"Motor desconocido: {engine!r}")
+                resultado = clasificar_texto(peticion["text"], engine=engine)
+            elif "path" in peticion:
+                cache = cache_del_proceso(ruta_cache) if ruta_cache else None
+                resultado = clasificar_ruta(peticion["path"], cache, estricto=True)
+            else:
+                raise ValueError("La petición necesita 'path' o 'text'")
+        paradigma, certeza, lectura = resultado
+        respuesta.update(paradigm=paradigma, certainty=certeza, read=lectura)
+    except (Exception, TiempoAgotado) as error:
+        respuesta["error"] = f"{type(error).__name__}: {error}"
+    respuesta["elapsed"] = round(time.perf_counter() - inicio, 6)
+    return respuesta
+
+
+class ManejadorPeticiones(socketserver.StreamRequestHandler):
+    """Lee peticiones de una conexión hasta que el cliente la cierra"""
+
+    def handle(self):
+        while True:
+            linea = self.rfile.readline(LIMITE_PETICION + 1)
+            if not linea:
+                return
+            if len(linea) > LIMITE_PETICION:
+                self.responder({"error": "ValueError: petición demasiado grande"})
+                return  # el resto de la línea no se puede resincronizar
+            if linea.strip():
+                self.responder(self.server.procesar(linea))
+
+    def responder(self, respuesta):
+        self.wfile.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class ServidorClasificacion(socketserver.ThreadingMixIn):
+    """Un hilo por conexión; la clasificación se delega al pool"""
+
+    daemon_threads = True
+    pool = None
+    timeout_peticion = None
+    ruta_cache = None
+
+    def procesar(self, linea):
+        """Respuesta a una línea de petición"""
+        try:
+            peticion = json.loads(linea)
+            if not isinstance(peticion, dict):
+                raise ValueError("La petición debe ser un objeto JSON")
+        except ValueError as error:
+            return {"error": f"{type(error).__name__}: {error}"}
+        try:
+            return self.pool.submit(
+                atender, peticion, self.timeout_peticion, self.ruta_cache).result()
+        except Exception as error:  # p. ej. un worker que murió
+            return {"error": f"{type(error).__name__}: {error}"}
+
+    def server_close(self):
+        super().server_close()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+
+class ServidorUnix(ServidorClasificacion, socketserver.UnixStreamServer):
+
+    def server_close(self):
+        super().server_close()
+        with suppress(FileNotFoundError):
+            os.unlink(self.server_address)
+
+
+class ServidorTCP(ServidorClasificacion, socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def liberar_socket(ruta):
+    """Borra un socket Unix abandonado; falla si otro servidor lo usa"""
+    if not os.path.exists(ruta):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as prueba:
+        try:
+            prueba.connect(ruta)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(ruta)
+            return
+    raise OSError(f"Ya hay un servidor escuchando en {ruta}")
+
+
+def crear_servidor(socket_unix=None, tcp=None, workers=None, timeout=None,
+                   ruta_cache=None):
+    """Crea (sin arrancar) el servidor y su pool de workers"""
+    if tcp is not None:
+        servidor = ServidorTCP(tcp, ManejadorPeticiones)
+    else:
+        socket_unix = socket_unix or SOCKET_POR_DEFECTO
+        liberar_socket(socket_unix)
+        servidor = ServidorUnix(socket_unix, ManejadorPeticiones)
+
+    servidor.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    servidor.timeout_peticion = timeout
+    servidor.ruta_cache = ruta_cache
+    return servidor
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        prog="classifier_server.py",
+        description="Servidor de clasificación (JSON por línea)",
+    )
+    destino = arg_parser.add_mutually_exclusive_group()
+    destino.add_argument("--socket", default=None,
+                         help=f"socket Unix donde escuchar ({SOCKET_POR_DEFECTO})")
+    destino.add_argument("--tcp", type=direccion_tcp, default=None,
+                         help="escuchar en TCP, [HOST:]PUERTO (127.0.0.1 por defecto)")
+    arg_parser.add_argument("-w", "--workers", type=int, default=None,
+                            help="procesos del pool (por defecto, núcleos)")
+    arg_parser.add_argument("-t", "--timeout", type=float, default=None,
+                            help="segundos máximos por petición")
+    arg_parser.add_argument("--cache", default=None,
+                            help="base de datos de la caché de resultados")
+    args = arg_parser.parse_args()
+
+    servidor = crear_servidor(args.socket, args.tcp, args.workers, args.timeout,
+                              args.cache)
+    print(f"Escuchando en {servidor.server_address}", file=sys.stderr)
+    # SIGTERM también cierra el servidor y borra el socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
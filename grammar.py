@@ -0,0 +1,190 @@
+"""
+Gramática del clasificador y construcción automática de su tabla LL(1).
+
+Las producciones se definen una sola vez en GRAMATICA; los conjuntos
+FIRST/FOLLOW y la tabla predictiva se calculan al importar el módulo.
+"""
+
+import hashlib
+
+# Tipos de token enteros (terminales); FUNC es una palabra clave de
+# función del perfil de lenguaje del scanner (def, function, fn...)
+EOF, CLASS, ID, LPAREN, RPAREN, LBRACE, RBRACE, FUNC = range(8)
+NUM_TERMINALES = 8
+
+# Nombre de cada terminal en la gramática, indexado por tipo de token
+NOMBRES_TERMINALES = ("$", "class", "id", "(", ")", "{", "}", "fn")
+TIPOS_TERMINALES = {nombre: tipo for tipo, nombre in enumerate(NOMBRES_TERMINALES)}
+
+EPSILON = "ε"
+
+# Acciones semánticas: no consumen tokens, actualizan los contadores
+CONTAR_CLASE = "#clase"
+CONTAR_FUNCION = "#funcion"
+ACCIONES = (CONTAR_CLASE, CONTAR_FUNCION)
+
+# Producciones en orden de preferencia: ante un conflicto LL(1) gana la
+# primera alternativa, igual que el orden de los if/elif del parser recursivo
+GRAMATICA = (
+    ("S", ("DCL", "S'")),
+    ("S'", ("S",)),
+    ("S'", ()),
+    ("DCL", (CONTAR_CLASE, "class", "id", "{", "S", "}")),
+    ("DCL", (CONTAR_FUNCION, "fn", "id", "(", "TEXT", ")", "DCL'''")),
+    ("DCL", ("id", "DCL''")),
+    ("DCL''", (CONTAR_FUNCION, "(", "TEXT", ")", "DCL'''")),
+    ("DCL''", ("TEXT", "DCL'")),
+    ("DCL'''", ("{", "S", "}")),
+    ("DCL'''", ()),
+    ("DCL'", ("{", "S", "}")),
+    ("DCL'", (CONTAR_FUNCION, "(", "TEXT", ")", "{", "S", "}")),
+    ("DCL'", ()),
+    ("TEXT", ("id", "TEXT'")),
+    ("TEXT", ()),
+    ("TEXT'", ("TEXT",)),
+    ("TEXT'", ()),
+)
+
+SIMBOLO_INICIAL = "S"
+
+# Cambia con cualquier cambio de la gramática (invalida cachés de resultados)
+VERSION_GRAMATICA = hashlib.sha1(repr(GRAMATICA).encode("utf-8")).hexdigest()[:12]
+
+
+class Gramatica:
+    """
+    Calcula FIRST, FOLLOW y la tabla LL(1) de una gramática.
+
+    Los símbolos de la pila del parser se codifican como enteros: primero
+    los terminales (su tipo de token), luego las acciones y al final los
+    no terminales.
+    """
+
+    def __init__(self, producciones, inicial, terminales=NOMBRES_TERMINALES,
+                 acciones=ACCIONES):
+        self.producciones = producciones
+        self.inicial = inicial
+        self.terminales = terminales
+        self.acciones = acciones
+
+        self.no_terminales = []
+        for cabeza, _ in producciones:
+            if cabeza not in self.no_terminales:
+                self.no_terminales.append(cabeza)
+
+        self.first = self.calcular_first()
+        self.follow = self.calcular_follow()
+        self.tabla, self.conflictos = self.construir_tabla()
+
+        self.codigos = {nombre: tipo for tipo, nombre in enumerate(terminales)}
+        for simbolo in acciones + tuple(self.no_terminales):
+            self.codigos[simbolo] = len(self.codigos)
+        self.base_no_terminales = len(terminales) + len(acciones)
+
+    def first_de_secuencia(self, simbolos):
+        """FIRST de una secuencia de símbolos; incluye ε si es anulable"""
+        resultado = set()
+        for simbolo in simbolos:
+            if simbolo in self.acciones:
+                continue
+            if simbolo in self.terminales:
+                resultado.add(simbolo)
+                return resultado
+            resultado |= self.first[simbolo] - {EPSILON}
+            if EPSILON not in self.first[simbolo]:
+                return resultado
+        resultado.add(EPSILON)
+        return resultado
+
+    def calcular_first(self):
+        """Punto fijo de FIRST para cada no terminal"""
+        self.first = {no_terminal: set() for no_terminal in self.no_terminales}
+        cambio = True
+        while cambio:
+            cambio = False
+            for cabeza, cuerpo in self.producciones:
+                nuevos = self.first_de_secuencia(cuerpo) - self.first[cabeza]
+                if nuevos:
+                    self.first[cabeza] |= nuevos
+                    cambio = True
+        return self.first
+
+    def calcular_follow(self):
+        """Punto fijo de FOLLOW para cada no terminal"""
+        follow = {no_terminal: set() for no_terminal in self.no_terminales}
+        follow[self.inicial].add("$")
+        cambio = True
+        while cambio:
+            cambio = False
+            for cabeza, cuerpo in self.producciones:
+                for i, simbolo in enumerate(cuerpo):
+                    if simbolo not in follow:
+                        continue
+                    resto = self.first_de_secuencia(cuerpo[i + 1:])
+                    nuevos = resto - {EPSILON}
+                    if EPSILON in resto:
+                        nuevos |= follow[cabeza]
+                    nuevos -= follow[simbolo]
+                    if nuevos:
+                        follow[simbolo] |= nuevos
+                        cambio = True
+        return follow
+
+    def construir_tabla(self):
+        """
+        Tabla predictiva tabla[no terminal][terminal] -> cuerpo.
+        Los conflictos se resuelven a favor de la producción anterior y se
+        devuelven como lista de (no terminal, terminal) para inspección.
+        """
+        tabla = {no_terminal: {} for no_terminal in self.no_terminales}
+        conflictos = []
+        for cabeza, cuerpo in self.producciones:
+            prediccion = self.first_de_secuencia(cuerpo)
+            if EPSILON in prediccion:
+                prediccion = (prediccion - {EPSILON}) | self.follow[cabeza]
+            for terminal in sorted(prediccion):
+                if terminal in tabla[cabeza]:
+                    conflictos.append((cabeza, terminal))
+                else:
+                    tabla[cabeza][terminal] = cuerpo
+        return tabla, conflictos
+
+    def tabla_plana(self):
+        """
+        Tabla para el parser iterativo, indexada por
+        (código del no terminal - base_no_terminales) * terminales + tipo.
+        Cada entrada es el cuerpo codificado e invertido, listo para apilar,
+        o None si es un error.
+        """
+        num_terminales = len(self.terminales)
+        plana = [None] * (len(self.no_terminales) * num_terminales)
+        for fila, no_terminal in enumerate(self.no_terminales):
+            for terminal, cuerpo in self.tabla[no_terminal].items():
+                codificado = tuple(self.codigos[s] for s in reversed(cuerpo))
+                plana[fila * num_terminales + self.codigos[terminal]] = codificado
+        return plana
+
+    def mascara(self, terminales):
+        """Bitset de terminales: bit tipo encendido por cada terminal"""
+        return sum(1 << self.codigos[t] for t in terminales if t != EPSILON)
+
+    def mascaras_first(self):
+        """FIRST de cada no terminal como bitset, indexado por fila"""
+        return [self.mascara(self.first[nt]) for nt in self.no_terminales]
+
+    def mascaras_follow(self):
+        """FOLLOW de cada no terminal como bitset, indexado por fila"""
+        return [self.mascara(self.follow[nt]) for nt in self.no_terminales]
+
+    def mascaras_sync(self):
+        """
+        Conjuntos de sincronización del modo pánico como bitsets:
+        FIRST ∪ FOLLOW de cada no terminal, más el fin de archivo
+        """
+        return [
+            self.mascara(self.first[nt] | self.follow[nt] | {"$"})
+            for nt in self.no_terminales
+        ]
+
+
+GRAMATICA_CLASIFICADOR = Gramatica(GRAMATICA, SIMBOLO_INICIAL)
@@ -1,49 +1,395 @@
+import argparse
+import re
 import sys
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
 
+from stats import Stats
+
+try:
+    import numpy as np
+except ImportError:  # optional: only the "numpy" engine needs it
+    np = None
+
+START_STATE  = 0
+IDENT_STATE  = 1
 ACCEPT_STATE = 2
 ERROR_STATE  = 3
 
 LPAREN_ID, RPAREN_ID, LBRACE, RBRACE_ID, CHAR, DIGIT, DEL, BLANK = range(8)
+NUM_CLASSES = 8
+NUM_STATES  = 4
+
+
+def categorize_char(ch: str) -> int:
+    """Reference character classifier; used directly only for non-ASCII."""
+    if ch == '(':        return LPAREN_ID
+    elif ch == ')':      return RPAREN_ID
+    elif ch == '{':      return LBRACE
+    elif ch == '}':      return RBRACE_ID
+    elif ch in ' \n\t\r\f\v':
+        return BLANK
+    elif ch.isalpha() or ch == '_':
+        return CHAR
+    elif ch.isdigit():
+        return DIGIT
+    else:
+        return DEL
+
+
+# Character class of every ASCII code point, built once at import
+CHAR_CLASSES = [categorize_char(chr(code)) for code in range(128)]
+
+# Same table as a uint8 lookup for the numpy engine
+CLASS_LUT = np.array(CHAR_CLASSES, dtype=np.uint8) if np is not None else None
+
+# DFA rows; missing entries go to ERROR_STATE
+_TRANSITION_ROWS = {
+    0: {
+        CHAR: 1,
+        BLANK: 0,
+        LPAREN_ID: ACCEPT_STATE, 
+        RPAREN_ID: ACCEPT_STATE,
+        LBRACE: ACCEPT_STATE, 
+        RBRACE_ID: ACCEPT_STATE,
+        DEL: 0,
+        DIGIT: 0,
+    },
+    1: {
+        CHAR: 1,
+        DIGIT: 1,
+        BLANK: ACCEPT_STATE,
+        LPAREN_ID: ACCEPT_STATE, 
+        RPAREN_ID: ACCEPT_STATE,
+        LBRACE: ACCEPT_STATE, 
+        RBRACE_ID: ACCEPT_STATE,
+        DEL: ACCEPT_STATE,
+    },
+}
+
+# Flat transition table indexed by state * NUM_CLASSES + class
+TRANSITIONS = [ERROR_STATE] * (NUM_STATES * NUM_CLASSES)
+for _state, _row in _TRANSITION_ROWS.items():
+    for _cls, _target in _row.items():
+        TRANSITIONS[_state * NUM_CLASSES + _cls] = _target
+
+
+# Same lexemes the DFA accepts, for the bulk `re` engine (ASCII input only)
+TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[(){}]")
+
+ENGINES = ("dfa", "re", "numpy")
+
+# Characters per read when streaming a file
+CHUNK_SIZE = 1 << 20
+
+IDENTIFIER_ID = 20
+
+# Keyword token codes: every profile maps its keywords onto these
+CLASS_KEYWORD_ID = 7
+FUNCTION_KEYWORD_ID = 8
+KEYWORD_NAMES = {CLASS_KEYWORD_ID: "class", FUNCTION_KEYWORD_ID: "function"}
+
+
+class LanguageProfile(NamedTuple):
+    """Reserved keywords of a language and the token code of each one."""
+    name: str
+    keywords: dict
+
+
+# Built-in profiles; "classic" is the original `class`-only scanner and
+# "generic" recognizes the keywords of every other profile
+PROFILES = {profile.name: profile for profile in (
+    LanguageProfile("classic", {"class": CLASS_KEYWORD_ID}),
+    LanguageProfile("python", {"class": CLASS_KEYWORD_ID, "def": FUNCTION_KEYWORD_ID}),
+    LanguageProfile("javascript", {"class": CLASS_KEYWORD_ID,
+                                   "function": FUNCTION_KEYWORD_ID}),
+    LanguageProfile("java", {"class": CLASS_KEYWORD_ID, "interface": CLASS_KEYWORD_ID}),
+    LanguageProfile("rust", {"struct": CLASS_KEYWORD_ID, "trait": CLASS_KEYWORD_ID,
+                             "fn": FUNCTION_KEYWORD_ID}),
+    LanguageProfile("go", {"func": FUNCTION_KEYWORD_ID}),
+    LanguageProfile("kotlin", {"class": CLASS_KEYWORD_ID, "interface": CLASS_KEYWORD_ID,
+                               "fun": FUNCTION_KEYWORD_ID}),
+)}
+PROFILES["generic"] = LanguageProfile("generic", {
+    word: code for profile in PROFILES.values() for word, code in profile.keywords.items()
+})
+DEFAULT_PROFILE = "classic"
+
+
+def get_profile(profile):
+    """Resolves a profile name (or a LanguageProfile) to a LanguageProfile."""
+    if isinstance(profile, LanguageProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown language profile: {profile!r}") from None
+
+# Binary token stream: header (magic, version, reserved byte), then one
+# byte per token code, identifiers followed by their symbol id as a
+# LEB128 varint. An END_OF_TOKENS byte may start the symbol table:
+# varint count, then varint length + UTF-8 name for ids 1..count.
+BINARY_MAGIC = b"TOKB"
+BINARY_VERSION = 1
+BINARY_HEADER = BINARY_MAGIC + bytes((BINARY_VERSION, 0))
+END_OF_TOKENS = 0
+OUTPUT_FORMATS = ("text", "binary")
+
+# Serialized symbol table: header, then the same name list as the binary
+# token trailer (ids are implicit, 1..count)
+SYMBOLS_MAGIC = b"SYMB"
+SYMBOLS_HEADER = SYMBOLS_MAGIC + bytes((BINARY_VERSION, 0))
+
+
+def read_chunks(f, chunk_size=CHUNK_SIZE):
+    """Yields the text of an open file in chunks of `chunk_size` characters."""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def split_segments(chunks):
+    """Yields (text, offset) segments of a stream of string chunks.
+
+    Each segment ends after its last non-word character, where the DFA is
+    back in its start state, so segments can be lexed independently; the
+    tail (a possibly unfinished identifier) is carried over to the next.
+    """
+    classes = CHAR_CLASSES
+    carry = ""
+    offset = 0
+    for chunk in chunks:
+        text = carry + chunk
+        cut = len(text)
+        while cut:
+            ch = text[cut - 1]
+            code = ord(ch)
+            cat = classes[code] if code < 128 else categorize_char(ch)
+            if cat != CHAR and cat != DIGIT:
+                break
+            cut -= 1
+
+        if cut:
+            yield text[:cut], offset
+        offset += cut
+        carry = text[cut:]
+
+    if carry:
+        yield carry, offset
+
+
+def lex_segment(text, offset, engine="dfa", track_symbols=True, profile=DEFAULT_PROFILE):
+    """Process-pool task: lexes one segment with its own symbol table.
+
+    Returns the segment's identifier names in local id order and its
+    tokens as parallel arrays (codes, local symbol ids, starts, ends),
+    which pickle far smaller than a list of Tokens.
+    """
+    scanner = Scanner(text, engine=engine, track_symbols=track_symbols, profile=profile)
+    codes = bytearray()
+    symbols = array("I")
+    starts = array("q")
+    ends = array("q")
+    for token in scanner.tokens():
+        codes.append(token.code)
+        symbols.append(token.symbol)
+        starts.append(token.start + offset)
+        ends.append(token.end + offset)
+    names = scanner.symbol_entry.names if track_symbols else None
+    return names, codes, symbols, starts, ends
+
+
+def segment_tokens(segment):
+    """The Tokens of a (codes, symbols, starts, ends) segment."""
+    return map(Token, *segment)
+
+
+def encode_varint(value, out):
+    """Appends `value` to the bytearray `out` as a LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, index):
+    """Reads a LEB128 varint at `index`; returns (value, next index)."""
+    value = shift = 0
+    while True:
+        byte = data[index]
+        index += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, index
+        shift += 7
+
+
+def encode_names(names, out):
+    """Appends a count and the length-prefixed UTF-8 `names` to `out`."""
+    encode_varint(len(names), out)
+    for name in names:
+        data = name.encode("utf-8")
+        encode_varint(len(data), out)
+        out += data
+
+
+def decode_names(data, index=0):
+    """Inverse of encode_names; returns (names, next index)."""
+    count, index = decode_varint(data, index)
+    names = []
+    for _ in range(count):
+        length, index = decode_varint(data, index)
+        names.append(bytes(data[index:index + length]).decode("utf-8"))
+        index += length
+    return names, index
+
+
+class SymbolTable:
+    """Identifier table that can be shared by many Scanners.
+
+    Ids are assigned from 1 in first-occurrence order and names are
+    interned, so a worker that scans many files keeps one copy of each
+    identifier. Iterates over names in id order, like the old dict.
+    """
+
+    def __init__(self, names=()):
+        self.ids = {}
+        self.names = []
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        """Returns the id of `name`, adding it if it is new."""
+        symbol = self.ids.get(name)
+        if symbol is None:
+            name = sys.intern(name)
+            self.names.append(name)
+            symbol = self.ids[name] = len(self.names)
+        return symbol
+
+    def name(self, symbol):
+        return self.names[symbol - 1]
+
+    def get(self, name, default=None):
+        return self.ids.get(name, default)
+
+    def items(self):
+        return self.ids.items()
+
+    def __getitem__(self, name):
+        return self.ids[name]
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __eq__(self, other):
+        if isinstance(other, SymbolTable):
+            return self.names == other.names
+        return NotImplemented
+
+    def to_bytes(self):
+        """Compact id <-> name form: header and the names in id order."""
+        out = bytearray(SYMBOLS_HEADER)
+        encode_names(self.names, out)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if bytes(data[:len(SYMBOLS_HEADER)]) != SYMBOLS_HEADER:
+            raise ValueError("Not a serialized symbol table")
+        names, _ = decode_names(data, len(SYMBOLS_HEADER))
+        return cls(names)
+
+    def dump(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def write_binary(tokens, f, symbol_entry=None):
+    """Writes tokens (and optionally the symbol table) in binary format."""
+    buffer = bytearray(BINARY_HEADER)
+    for token in tokens:
+        buffer.append(token.code)
+        if token.code == IDENTIFIER_ID:
+            encode_varint(token.symbol, buffer)
+        if len(buffer) >= 1 << 16:
+            f.write(buffer)
+            buffer.clear()
+
+    if symbol_entry is not None:
+        buffer.append(END_OF_TOKENS)
+        encode_names(list(symbol_entry), buffer)  # iteration order is id order
+    f.write(buffer)
+
+
+class Token(NamedTuple):
+    """Typed token: scanner code, symbol-table entry for identifiers and
+    the (start, end) span of the lexeme in the source."""
+    code: int
+    symbol: int = 0
+    start: int = 0
+    end: int = 0
+
+    def __str__(self):
+        """Text protocol: <code> or <code, symbol> for identifiers.
+
+        Identifiers scanned without a symbol table have symbol 0 and are
+        written as <20>.
+        """
+        if self.code == IDENTIFIER_ID and self.symbol:
+            return f"<{self.code}, {self.symbol}>"
+        return f"<{self.code}>"
+
 
 class Scanner():
-    def __init__(self, input_text):
-        
-        self.T = {
-            0: {
-                CHAR: 1,
-                BLANK: 0,
-                LPAREN_ID: ACCEPT_STATE, 
-                RPAREN_ID: ACCEPT_STATE,
-                LBRACE: ACCEPT_STATE, 
-                RBRACE_ID: ACCEPT_STATE,
-                DEL: 0,
-                DIGIT: 0,
-            },
-            1: {
-                CHAR: 1,
-                DIGIT: 1,
-                BLANK: ACCEPT_STATE,
-                LPAREN_ID: ACCEPT_STATE, 
-                RPAREN_ID: ACCEPT_STATE,
-                LBRACE: ACCEPT_STATE, 
-                RBRACE_ID: ACCEPT_STATE,
-                DEL: ACCEPT_STATE,
-            },
-        }
+    def __init__(self, input_text, emit=print, engine="dfa", symbols=None,
+                 track_symbols=True, stats=None, workers=1, profile=DEFAULT_PROFILE):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown scanner engine: {engine!r}")
+        if engine == "numpy" and np is None:
+            raise ImportError("The numpy scanner engine requires NumPy")
 
         self.TOKEN_CODES = {'(':1, ')':2, '{':3, '}':4}
-        self.RESERVED_KEYWORDS = {'class':7}
-        self.IDENTIFIER_ID = 20
+        # Keywords of the language profile, looked up once per identifier
+        self.profile = get_profile(profile)
+        self.RESERVED_KEYWORDS = self.profile.keywords
+        self.IDENTIFIER_ID = IDENTIFIER_ID
 
         self.input_text = input_text
-        self.input_iterator = iter(input_text)  # Create iterator from input text
+        self.engine = engine
 
-        self.current_token = ""
-        self.ch = None
+        # Pass a SymbolTable to share identifier ids across inputs. With
+        # track_symbols=False (classification only) there is no table and
+        # every identifier gets symbol 0
+        if not track_symbols:
+            self.symbol_entry = None
+        else:
+            self.symbol_entry = SymbolTable() if symbols is None else symbols
+
+        # Destino de cada token emitido (stdout por defecto)
+        self.emit = emit
 
-        self.state = 0
+        # Optional stats.Stats filled in while scanning
+        self.stats = stats
 
-        self.symbol_entry = {}
+        # With workers > 1 the input is lexed in segments across a
+        # process pool (see parallel_tokens)
+        self.workers = workers
 
     def Accept(self, state: int) -> bool:
         """Checks if the current state is an accepting state."""
@@ -61,119 +407,327 @@ class Scanner():
     def categorize(self, ch: str):
         if ch is None:
             return DEL
-        if ch == '(':        return LPAREN_ID
-        elif ch == ')':      return RPAREN_ID
-        elif ch == '{':      return LBRACE
-        elif ch == '}':      return RBRACE_ID
-        elif ch == ' ':      return BLANK
-        elif ch == '\n':     return BLANK
-        elif ch == '\t':     return BLANK
-        elif ch == '\r':     return BLANK
-        elif ch == '\f':     return BLANK
-        elif ch == '\v':     return BLANK
-        elif ch.isalpha() or ch == '_':
-            return CHAR
-        elif ch.isdigit():
-            return DIGIT
-        else:
-            return DEL
+        code = ord(ch)
+        if code < 128:
+            return CHAR_CLASSES[code]
+        return categorize_char(ch)
         
-    def record_token(self):
-        # Make a substring from the initial token position to index
-        token = self.current_token.strip()
-
-        should_move_char = True
-        #Here I identify the las valid character
-        if len(self.current_token) > 1:
-            if self.current_token[-1] in self.TOKEN_CODES: # ! CHANGED
-                should_move_char = False 
-            if self.categorize(self.current_token[-1]) != CHAR:
-                token = self.current_token[:-1]
-
-        # Check if the token is a reserved keyword
-        if token in self.RESERVED_KEYWORDS:
-            print(f"<{self.RESERVED_KEYWORDS[token]}>")
-
-        elif token in self.TOKEN_CODES:         # Check if the token is a special symbol
-            print(f"<{self.TOKEN_CODES[token]}>")
-
-        elif token == '': # Ignore empty tokens
-            # Ignore blank spaces
-            pass
-        else: # Identifier
-            
-            if token not in self.symbol_entry: # Generate a new entry
-                # Add the token to the symbol table
-                # and assign it a unique identifier
-                self.symbol_entry[token] = len(self.symbol_entry) + 1
-            print(f"<{self.IDENTIFIER_ID}, {self.symbol_entry[token]}>")
-
-        if should_move_char:
-            self.ch = self.next_input_character()
-
-    def Advance(self, state: int, ch: str) -> bool:
-        """Advances the scanner state and records the character."""
-        # If the state is 0, reset the current token
-        if state == 0:
-            self.current_token = ""
-
-        # If the state is error or accept, do not advance
-        return not (self.Error(state) or self.Accept(state))
-
-    def next_input_character(self):
-        """Returns the next character from the input string using iterator."""
-        try:
-            return next(self.input_iterator)
-        except StopIteration:
-            self.state = ACCEPT_STATE # End of input
-            return None
+    def tokens(self):
+        """Generates the typed tokens of the input lazily.
 
-    def scan(self):
-        self.ch = self.next_input_character()
-        while self.ch is not None:  # not EOF
-            self.state = 0  # start DFA
-            self.current_token = ""  # reset token
-            while not self.Accept(self.state) and not self.Error(self.state):
-                self.current_token += self.ch
-                cat = self.categorize(self.ch)
-                self.state = self.T[self.state][cat]
-                
-                if self.Advance(self.state, self.ch):  # Updated to use self.ch
-                    self.ch = self.next_input_character()
-            
-            # end of DFA
-            if self.Accept(self.state):
-                
-                self.record_token()
-                
+        The input is either a string or an iterable of string chunks.
+        """
+        if self.engine == "re":
+            engine = self.regex_tokens
+        elif self.engine == "numpy":
+            engine = self.numpy_tokens
+        else:
+            engine = self.dfa_tokens
+
+        if self.stats is not None:
+            return self.counted_tokens(engine)
+        if self.workers > 1:
+            return self.pooled_tokens(self.input_text)
+        if isinstance(self.input_text, str):
+            return engine(self.input_text)
+        return self.chunked_tokens(engine, self.input_text)
+
+    def counted_tokens(self, engine):
+        """tokens() with timings and counters recorded in self.stats."""
+        stats = self.stats
+        if self.workers > 1:
+            text = self.input_text
+            if isinstance(text, str):
+                stats.chars_read += len(text)
             else:
+                text = stats.reading(text)
+            tokens = self.pooled_tokens(text)
+        elif isinstance(self.input_text, str):
+            stats.chars_read += len(self.input_text)
+            tokens = engine(self.input_text)
+        else:
+            tokens = self.chunked_tokens(engine, stats.reading(self.input_text))
+
+        names = {code: char for char, code in self.TOKEN_CODES.items()}
+        names.update((code, word) for word, code in self.RESERVED_KEYWORDS.items())
+        names.update(KEYWORD_NAMES)
+        names[self.IDENTIFIER_ID] = "id"
+        kinds = stats.tokens_by_kind
+        depth = 0
+        for token in stats.timed("lex", tokens):
+            name = names[token.code]
+            kinds[name] = kinds.get(name, 0) + 1
+            if token.code == self.TOKEN_CODES["{"]:
+                depth += 1
+                stats.max_depth = max(stats.max_depth, depth)
+            elif token.code == self.TOKEN_CODES["}"] and depth:
+                depth -= 1
+            yield token
+
+        if self.symbol_entry is not None:
+            stats.symbols = len(self.symbol_entry)
+
+    def chunked_tokens(self, engine, chunks):
+        """Runs `engine` chunk by chunk with bounded memory (see split_segments)."""
+        for text, offset in split_segments(chunks):
+            yield from engine(text, offset)
+
+    def pooled_tokens(self, text):
+        """parallel_tokens() in a pool of self.workers processes."""
+        for segment in self.pooled_segments(text):
+            yield from segment_tokens(segment)
+
+    def pooled_segments(self, text):
+        """parallel_segments() in a pool of self.workers processes."""
+        chunks = text
+        if isinstance(text, str):
+            chunks = (text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            yield from self.parallel_segments(pool, chunks, 2 * self.workers)
+
+    def parallel_tokens(self, executor, chunks, in_flight=8):
+        """Tokens of parallel_segments(), in input order."""
+        for segment in self.parallel_segments(executor, chunks, in_flight):
+            yield from segment_tokens(segment)
+
+    def parallel_segments(self, executor, chunks, in_flight=8):
+        """Lexes the segments of `chunks` in `executor` and merges them.
+
+        Yields each segment as (codes, symbols, starts, ends) arrays. At
+        most `in_flight` segments are pending at a time. Each segment is
+        lexed with a local symbol table; merging the segments in input
+        order interns their names in local first-occurrence order, so the
+        ids are exactly those a serial scan would assign.
+        """
+        track_symbols = self.symbol_entry is not None
+        pending = deque()
+        for text, offset in split_segments(chunks):
+            pending.append(executor.submit(lex_segment, text, offset, self.engine,
+                                           track_symbols, self.profile))
+            if len(pending) >= in_flight:
+                yield self.merge_segment(pending.popleft().result())
+        while pending:
+            yield self.merge_segment(pending.popleft().result())
+
+    def merge_segment(self, segment):
+        """A lex_segment() result as arrays renumbered into symbol_entry.
+
+        The local ids are remapped on the array without building a Token
+        per token; the first segment usually keeps its ids unchanged.
+        """
+        names, codes, symbols, starts, ends = segment
+        if names is not None:
+            intern = self.symbol_entry.intern
+            remap = [0]
+            remap.extend(intern(name) for name in names)
+            if remap != list(range(len(remap))):
+                symbols = array("I", map(remap.__getitem__, symbols))
+        return codes, symbols, starts, ends
+
+    def dfa_tokens(self, text, offset=0):
+        """Reference engine: hand-written DFA over the input.
+
+        The DFA walks offsets into the source; a lexeme is sliced only once
+        it is accepted and blank runs are skipped without allocating.
+        Spans are shifted by `offset`.
+        """
+        length = len(text)
+        classes = CHAR_CLASSES
+        transitions = TRANSITIONS
+        keywords = self.RESERVED_KEYWORDS
+        symbols = self.symbol_entry
+        if symbols is not None:
+            symbol_ids = symbols.ids
+            intern = symbols.intern
+
+        # Characters that end an identifier are looked up twice
+        rescans = 0
+
+        index = 0
+        while index < length:
+            ch = text[index]
+            code = ord(ch)
+            cat = classes[code] if code < 128 else categorize_char(ch)
+            state = transitions[START_STATE * NUM_CLASSES + cat]
+
+            if state == START_STATE:  # blanks, digits and other symbols
+                index += 1
+                continue
+
+            start = index
+            index += 1
+
+            if self.Accept(state):  # single-character delimiter
+                yield Token(self.TOKEN_CODES[ch], 0, start + offset, index + offset)
+                continue
+
+            if self.Error(state):
                 self.error_message()
-                # Stop on error
-                # break
+                continue
+
+            # Identifier: stay in IDENT_STATE until a character leaves it;
+            # that character is examined again from the start state
+            while index < length:
+                ch = text[index]
+                code = ord(ch)
+                cat = classes[code] if code < 128 else categorize_char(ch)
+                state = transitions[IDENT_STATE * NUM_CLASSES + cat]
+                if state != IDENT_STATE:
+                    rescans += 1
+                    break
+                index += 1
+
+            lexeme = text[start:index]
+
+            # A single hash probe tells keywords of the profile apart
+            keyword = keywords.get(lexeme)
+            if keyword is not None:
+                yield Token(keyword, 0, start + offset, index + offset)
+            elif symbols is None: # Identifier, classification only
+                yield Token(self.IDENTIFIER_ID, 0, start + offset, index + offset)
+            else: # Identifier
+                # Look the lexeme up, or add it to the symbol table
+                # with a new unique identifier
+                symbol = symbol_ids.get(lexeme) or intern(lexeme)
+                yield Token(self.IDENTIFIER_ID, symbol, start + offset, index + offset)
+
+        if self.stats is not None:
+            self.stats.dfa_transitions += length + rescans
+
+    def regex_tokens(self, text, offset=0):
+        """Bulk engine: one compiled pattern iterated with re.finditer.
+
+        The character loop runs in C. Produces exactly the DFA's tokens;
+        non-ASCII input, whose letter/digit classes the pattern does not
+        mirror, is handed to the DFA instead.
+        """
+        if not text.isascii():
+            yield from self.dfa_tokens(text, offset)
+            return
+
+        spans = (match.span() for match in TOKEN_PATTERN.finditer(text))
+        yield from self.lexeme_tokens(text, spans, offset)
+
+    def numpy_tokens(self, text, offset=0):
+        """Vectorized engine for ASCII input.
+
+        Bytes are mapped to character classes with a lookup table and token
+        boundaries are found where the class changes; keywords and symbol
+        ids are resolved only at those boundaries. Non-ASCII input is
+        handed to the DFA.
+        """
+        if not text.isascii():
+            yield from self.dfa_tokens(text, offset)
+            return
+
+        classes = CLASS_LUT[np.frombuffer(text.encode("ascii"), dtype=np.uint8)]
+
+        # Maximal runs of letters/digits
+        word = (classes == CHAR) | (classes == DIGIT)
+        edges = np.flatnonzero(np.diff(word, prepend=False, append=False))
+        run_starts, run_ends = edges[0::2], edges[1::2]
+
+        # The DFA skips leading digits, so an identifier starts at the
+        # first letter of its run; runs made only of digits yield nothing
+        letters = np.flatnonzero(classes == CHAR)
+        first = np.searchsorted(letters, run_starts)
+        letters = np.append(letters, len(classes))
+        id_starts = letters[first]
+        has_letter = id_starts < run_ends
+        id_starts, id_ends = id_starts[has_letter], run_ends[has_letter]
+
+        # Delimiter classes come first in the class numbering
+        delimiters = np.flatnonzero(classes <= RBRACE_ID)
+
+        starts = np.concatenate((id_starts, delimiters))
+        ends = np.concatenate((id_ends, delimiters + 1))
+        order = np.argsort(starts, kind="stable")
+        spans = zip(starts[order].tolist(), ends[order].tolist())
+        yield from self.lexeme_tokens(text, spans, offset)
+
+    def lexeme_tokens(self, text, spans, offset=0):
+        """Turns accepted (start, end) spans of `text` into tokens."""
+        keywords = self.RESERVED_KEYWORDS
+        symbols = self.symbol_entry
+        if symbols is not None:
+            symbol_ids = symbols.ids
+            intern = symbols.intern
+        for start, end in spans:
+            lexeme = text[start:end]
+
+            code = self.TOKEN_CODES.get(lexeme) or keywords.get(lexeme)
+            if code is not None:
+                yield Token(code, 0, start + offset, end + offset)
+            elif symbols is None:
+                yield Token(self.IDENTIFIER_ID, 0, start + offset, end + offset)
+            else:
+                symbol = symbol_ids.get(lexeme) or intern(lexeme)
+                yield Token(self.IDENTIFIER_ID, symbol, start + offset, end + offset)
+
+    def scan(self):
+        """Emits every token in the text protocol."""
+        for token in self.tokens():
+            self.emit(str(token))
+
+    def scan_binary(self, f):
+        """Writes every token and the symbol table to `f` in binary format."""
+        write_binary(self.tokens(), f, self.symbol_entry)
+
     def print_symbol_table(self):
         """Prints the symbol table."""
         print("Symbol Table:")
-        for token, id in self.symbol_entry.items():
+        for token, id in (self.symbol_entry or {}).items():
             print(f"{token}: {id}")
         
 def main():
     if len(sys.argv) < 2:
-        print("Uso: python lexical_analyzer.py <archivo>")
+        print("Uso: python lexical_analyzer.py [--engine {dfa,re,numpy}] "
+              "[--format {text,binary}] [-o salida] [--stats] [--workers N] "
+              "[--profile PERFIL] <archivo>")
         return
 
-    with open(sys.argv[1], encoding="utf-8") as f:
-        input_text = f.read()
+    arg_parser = argparse.ArgumentParser(prog="lexical_analyzer.py")
+    arg_parser.add_argument("archivo")
+    arg_parser.add_argument("--engine", choices=ENGINES, default="dfa",
+                            help="motor del scanner (dfa por defecto)")
+    arg_parser.add_argument("--format", choices=OUTPUT_FORMATS, default="text",
+                            help="formato de salida (text por defecto)")
+    arg_parser.add_argument("-o", "--output", default=None,
+                            help="archivo de salida (output.txt / output.tok)")
+    arg_parser.add_argument("--stats", action="store_true",
+                            help="imprimir tiempos y contadores en stderr")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="procesos que escanean bloques en paralelo")
+    arg_parser.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                            help="palabras clave del lenguaje (classic por defecto)")
+    args = arg_parser.parse_args()
+    stats = Stats() if args.stats else None
 
-    original_stdout = sys.stdout          # guardamos stdout “normal”
-    sys.stdout = open("output.txt", "w", encoding="utf-8")
+    if args.format == "binary":
+        with open(args.archivo, encoding="utf-8") as f, \
+                open(args.output or "output.tok", "wb") as salida:
+            Scanner(read_chunks(f), engine=args.engine, stats=stats,
+                    workers=args.workers, profile=args.profile).scan_binary(salida)
+        if stats is not None:
+            print(stats.report(), file=sys.stderr)
+        return
 
-    try:
-        scanner = Scanner(input_text)
-        scanner.scan()        # todo lo que imprima → output.txt
-        scanner.print_symbol_table()  # Imprime la tabla de símbolos
-    finally:
-        sys.stdout.close()                # cerramos archivo
-        sys.stdout = original_stdout      # restauramos stdout
+    with open(args.archivo, encoding="utf-8") as f:
+        original_stdout = sys.stdout          # guardamos stdout “normal”
+        sys.stdout = open(args.output or "output.txt", "w", encoding="utf-8")
+
+        try:
+            # La entrada se lee por bloques: memoria acotada en archivos grandes
+            scanner = Scanner(read_chunks(f), engine=args.engine, stats=stats,
+                              workers=args.workers, profile=args.profile)
+            scanner.scan()        # todo lo que imprima → output.txt
+            scanner.print_symbol_table()  # Imprime la tabla de símbolos
+        finally:
+            sys.stdout.close()                # cerramos archivo
+            sys.stdout = original_stdout      # restauramos stdout
+
+    if stats is not None:
+        print(stats.report(), file=sys.stderr)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Caché en disco de clasificaciones, direccionada por contenido.
+
+La clave es el hash del contenido del archivo más la versión del
+analizador y de la gramática y el tipo de clasificador (código fuente o
+salida del scanner), así que un archivo sin cambios se resuelve
+con un hash y una consulta. Los datos viven en SQLite (modo WAL), que
+permite usar la misma caché desde varios procesos a la vez; las entradas
+menos usadas se descartan al superar `max_entradas`.
+"""
+
+import hashlib
+import sqlite3
+import time
+import zlib
+from contextlib import suppress
+
+from grammar import VERSION_GRAMATICA
+from syntax_analyzer import ANALYZER_VERSION, Result
+
+# Inserciones entre comprobaciones del límite de entradas
+REVISAR_CADA = 128
+
+# Cómo se leyó el archivo: el mismo contenido clasificado como código
+# fuente o como salida del scanner da resultados distintos
+TIPOS = ("source", "tokens")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    clave TEXT PRIMARY KEY,
+    paradigma TEXT NOT NULL,
+    certeza INTEGER NOT NULL,
+    lectura REAL NOT NULL,
+    tokens BLOB,
+    usado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado);
+"""
+
+
+def hash_archivo(ruta, version=""):
+    """Hash del contenido de un archivo (leído por bloques) y la versión"""
+    digest = hashlib.blake2b(version.encode("utf-8"), digest_size=20)
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Resultados (paradigma, certeza, lectura) y, opcionalmente, el stream de
+    tokens en formato de texto, comprimido con zlib.
+    """
+
+    def __init__(self, ruta, max_entradas=1_000_000, timeout=30.0):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.version = f"{ANALYZER_VERSION}:{VERSION_GRAMATICA}"
+        self.inserciones = 0
+
+        self.conexion = sqlite3.connect(ruta, timeout=timeout, isolation_level=None)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(_ESQUEMA)
+
+    def close(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def clave(self, ruta, tipo="source"):
+        """Clave de un archivo: hash de su contenido, la versión y el tipo"""
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de clasificador desconocido: {tipo!r}")
+        return hash_archivo(ruta, f"{self.version}:{tipo}")
+
+    def obtener(self, clave):
+        """Resultado guardado para `clave` o None; marca la entrada como usada"""
+        fila = self.conexion.execute(
+            "SELECT paradigma, certeza, lectura FROM resultados WHERE clave = ?",
+            (clave,),
+        ).fetchone()
+        if fila is None:
+            return None
+
+        self.conexion.execute(
+            "UPDATE resultados SET usado = ? WHERE clave = ?", (time.time(), clave)
+        )
+        return Result(*fila)
+
+    def tokens(self, clave):
+        """Stream de tokens guardado para `clave` (texto) o None"""
+        fila = self.conexion.execute(
+            "SELECT tokens FROM resultados WHERE clave = ?", (clave,)
+        ).fetchone()
+        if fila is None or fila[0] is None:
+            return None
+        return zlib.decompress(fila[0]).decode("utf-8")
+
+    def guardar(self, clave, resultado, tokens=None):
+        """Guarda un resultado (y el stream de tokens si se da)"""
+        comprimidos = None if tokens is None else zlib.compress(tokens.encode("utf-8"))
+        paradigma, certeza, lectura = resultado
+        self.conexion.execute(
+            "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?)",
+            (clave, paradigma, certeza, lectura, comprimidos, time.time()),
+        )
+
+        self.inserciones += 1
+        if self.inserciones % REVISAR_CADA == 0:
+            self.descartar()
+
+    def descartar(self):
+        """Elimina las entradas menos usadas que excedan max_entradas"""
+        (total,) = self.conexion.execute("SELECT COUNT(*) FROM resultados").fetchone()
+        sobrantes = total - self.max_entradas
+        if sobrantes > 0:
+            self.conexion.execute(
+                "DELETE FROM resultados WHERE clave IN "
+                "(SELECT clave FROM resultados ORDER BY usado LIMIT ?)",
+                (sobrantes,),
+            )
+
+    def clasificar(self, ruta, clasificador, tokens=None, tipo="source"):
+        """
+        Devuelve el resultado en caché de `ruta` o lo calcula con
+        `clasificador(ruta)` y lo guarda. `tokens(ruta)`, si se da, genera
+        el stream de tokens que se guarda junto al resultado. `tipo` (uno
+        de TIPOS) dice cómo lee el archivo `clasificador`, que debe
+        propagar sus errores: lo que devuelve se guarda tal cual. Si falla
+        la propia base de datos se clasifica sin caché.
+        """
+        clave = self.clave(ruta, tipo)
+        try:
+            resultado = self.obtener(clave)
+        except sqlite3.Error:
+            return Result(*clasificador(ruta))
+
+        if resultado is None:
+            resultado = Result(*clasificador(ruta))
+            stream = tokens(ruta) if tokens else None
+            with suppress(sqlite3.Error):
+                self.guardar(clave, resultado, stream)
+        return resultado
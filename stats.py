@@ -0,0 +1,96 @@
+"""
+Instrumentation for the scanner and the parser (opt-in).
+
+A Stats object passed to Scanner, RecursiveDescentParser or classify()
+collects wall time per phase and a few counters. The pipeline is lazy
+(the parser pulls tokens, the scanner pulls chunks), so phase times are
+exclusive: time spent pulling from a nested phase is charged to that phase.
+"""
+
+import time
+from contextlib import contextmanager
+
+PHASES = ("read", "lex", "token_parse", "parse", "score")
+
+
+class Stats:
+    """Per-phase wall times (seconds) and pipeline counters."""
+
+    def __init__(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.chars_read = 0
+        self.dfa_transitions = 0
+        self.tokens_by_kind = {}
+        self.recoveries = 0
+        self.max_depth = 0
+        self.symbols = 0
+
+        self._stack = []
+        self._mark = 0.0
+
+    def enter(self, phase):
+        """Starts charging time to `phase` (pausing the enclosing phase)."""
+        now = time.perf_counter()
+        if self._stack:
+            self.times[self._stack[-1]] += now - self._mark
+        self._stack.append(phase)
+        self._mark = now
+
+    def exit(self):
+        """Stops charging the current phase and resumes the enclosing one."""
+        now = time.perf_counter()
+        self.times[self._stack.pop()] += now - self._mark
+        self._mark = now
+
+    @contextmanager
+    def phase(self, phase):
+        self.enter(phase)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def timed(self, phase, iterable):
+        """Yields from `iterable`, charging each step to `phase`."""
+        iterator = iter(iterable)
+        while True:
+            self.enter(phase)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.exit()
+            yield item
+
+    def reading(self, chunks):
+        """Times the read phase of `chunks` and counts their characters."""
+        for chunk in self.timed("read", chunks):
+            self.chars_read += len(chunk)
+            yield chunk
+
+    def as_dict(self):
+        return {
+            "times": dict(self.times),
+            "chars_read": self.chars_read,
+            "dfa_transitions": self.dfa_transitions,
+            "tokens_by_kind": dict(self.tokens_by_kind),
+            "recoveries": self.recoveries,
+            "max_depth": self.max_depth,
+            "symbols": self.symbols,
+        }
+
+    def report(self):
+        """Human-readable summary, one line per phase and counter."""
+        lines = [f"{phase + ' time:':<18}{seconds:.6f} s"
+                 for phase, seconds in self.times.items()]
+        kinds = " ".join(f"{kind}={count}" for kind, count in self.tokens_by_kind.items())
+        lines += [
+            f"{'chars read:':<18}{self.chars_read}",
+            f"{'dfa transitions:':<18}{self.dfa_transitions}",
+            f"{'tokens by kind:':<18}{kinds}",
+            f"{'recoveries:':<18}{self.recoveries}",
+            f"{'max depth:':<18}{self.max_depth}",
+            f"{'symbols:':<18}{self.symbols}",
+        ]
+        return "\n".join(lines)
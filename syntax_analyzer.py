@@ -1,5 +1,120 @@
+import argparse
+import mmap
 import sys
 import os
+from array import array
+from collections import deque
+from itertools import chain, islice
+from typing import NamedTuple
+
+from grammar import (
+    CLASS, CONTAR_CLASE, CONTAR_FUNCION, EOF, FUNC, GRAMATICA_CLASIFICADOR,
+    ID, LBRACE, LPAREN, NUM_TERMINALES, RBRACE, RPAREN, SIMBOLO_INICIAL,
+    TIPOS_TERMINALES,
+)
+from lexical_analyzer import (
+    BINARY_HEADER, BINARY_MAGIC, DEFAULT_PROFILE, END_OF_TOKENS, IDENTIFIER_ID,
+    PROFILES, Scanner, read_chunks,
+)
+from stats import Stats
+
+
+# Versión del analizador: subirla cuando cambie el resultado de una entrada
+ANALYZER_VERSION = "2"
+
+
+class Result(NamedTuple):
+    """Resultado de una clasificación: paradigma, certeza y % de lectura"""
+
+    paradigm: str
+    certainty: int
+    read: float
+
+# Mapeo de códigos del scanner a tipos de token del parser (grammar.py)
+TOKEN_MAP = {
+    "7": CLASS,  # class keyword (class, struct, interface... según el perfil)
+    "8": FUNC,  # function keyword (def, function, fn... según el perfil)
+    "1": LPAREN,  # left parenthesis
+    "2": RPAREN,  # right parenthesis
+    "3": LBRACE,  # left brace
+    "4": RBRACE,  # right brace
+}
+
+IDENTIFIER_CODE = "20"
+
+# Mismo mapeo, indexado por el código entero de los tokens tipados
+CODIGOS_SCANNER = {int(code): kind for code, kind in TOKEN_MAP.items()}
+
+# Y como tabla de bytes.translate(); _SIN_TIPO marca los códigos que el
+# parser ignora
+_SIN_TIPO = 255
+_TABLA_CODIGOS = bytes(
+    ID if code == IDENTIFIER_ID else CODIGOS_SCANNER.get(code, _SIN_TIPO)
+    for code in range(256)
+)
+
+# Los tokens del parser son pares (tipo, id de símbolo); el id es 0
+# salvo en los identificadores
+EOF_TOKEN = (EOF, 0)
+
+PARSER_ENGINES = ("iterative", "recursive")
+
+# "best_match": recovery original (como mucho max_recovery_attempts, sin
+# consumir tokens); "panic": modo pánico del motor iterativo
+RECOVERY_MODES = ("best_match", "panic")
+
+# Tabla LL(1) generada a partir de grammar.GRAMATICA
+_TABLA_LL1 = GRAMATICA_CLASIFICADOR.tabla_plana()
+_BASE_NO_TERMINALES = GRAMATICA_CLASIFICADOR.base_no_terminales
+_INICIAL = GRAMATICA_CLASIFICADOR.codigos[SIMBOLO_INICIAL]
+_ACCION_CLASE = GRAMATICA_CLASIFICADOR.codigos[CONTAR_CLASE]
+_ACCION_FUNCION = GRAMATICA_CLASIFICADOR.codigos[CONTAR_FUNCION]
+_FIRST_BITS = GRAMATICA_CLASIFICADOR.mascaras_first()
+_FOLLOW_BITS = GRAMATICA_CLASIFICADOR.mascaras_follow()
+_SYNC_BITS = GRAMATICA_CLASIFICADOR.mascaras_sync()
+
+# Conjuntos FIRST/FOLLOW para los procedimientos recursivos
+FIRST = {
+    nt: frozenset(TIPOS_TERMINALES[t] for t in c if t in TIPOS_TERMINALES)
+    for nt, c in GRAMATICA_CLASIFICADOR.first.items()
+}
+FOLLOW = {
+    nt: frozenset(TIPOS_TERMINALES[t] for t in c)
+    for nt, c in GRAMATICA_CLASIFICADOR.follow.items()
+}
+TOKENS_PROGRAMACION = frozenset(range(NUM_TERMINALES)) - {EOF}
+
+
+class TokenStore:
+    """
+    Tokens del parser en dos arrays paralelos: el tipo (un byte) y el id de
+    símbolo (entero sin signo). Ocupa unos 5 bytes por token en lugar de
+    una tupla y un string por identificador.
+    """
+
+    def __init__(self, tokens=()):
+        self.kinds = array("B")
+        self.symbols = array("I")
+        self.extend(tokens)
+
+    def append(self, kind, symbol=0):
+        self.kinds.append(kind)
+        self.symbols.append(symbol)
+
+    def extend(self, tokens):
+        for kind, symbol in tokens:
+            self.kinds.append(kind)
+            self.symbols.append(symbol)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        return (self.kinds[index], self.symbols[index])
+
+    def __iter__(self):
+        return zip(self.kinds, self.symbols)
+
 
 class TokenParser:
     """
@@ -7,23 +122,70 @@ class TokenParser:
     """
 
     def __init__(self, scanner_output):
+        # Texto completo, iterable de líneas (p. ej. un archivo abierto) o
+        # el formato binario como bytes/memoryview
         self.scanner_output = scanner_output
-        self.tokens = []
+        self.tokens = TokenStore()
 
     def parse_scanner_output(self):
         """
         Convierte la salida del scanner en tokens para el parser
         """
-        # Mapeo de códigos del scanner a tokens del parser
-        TOKEN_MAP = {
-            "7": "class",  # class keyword
-            "1": "(",  # left parenthesis
-            "2": ")",  # right parenthesis
-            "3": "{",  # left brace
-            "4": "}",  # right brace
-        }
+        self.tokens = TokenStore(self.iter_tokens())
+        return self.tokens
 
-        lines = self.scanner_output.strip().split("\n")
+    def iter_tokens(self):
+        """
+        Genera los tokens del parser uno a uno, sin construir la lista
+        """
+        if isinstance(self.scanner_output, (bytes, bytearray, memoryview, mmap.mmap)):
+            return self.iter_binary_tokens()
+        return self.iter_text_tokens()
+
+    def iter_binary_tokens(self):
+        """
+        Lee el formato binario sin copiarlo: recorre un memoryview byte a
+        byte y decodifica los ids de identificador (varint)
+        """
+        with memoryview(self.scanner_output) as data:
+            yield from self.decode_binary(data)
+
+    def decode_binary(self, data):
+        """Decodifica los tokens de un memoryview en formato binario"""
+        if data[:len(BINARY_HEADER)] != BINARY_HEADER:
+            raise ValueError("Cabecera de tokens binaria no válida")
+
+        index = len(BINARY_HEADER)
+        length = len(data)
+        while index < length:
+            code = data[index]
+            index += 1
+            if code == END_OF_TOKENS:  # empieza la tabla de símbolos
+                break
+
+            if code == IDENTIFIER_ID:
+                symbol = shift = 0
+                while True:
+                    byte = data[index]
+                    index += 1
+                    symbol |= (byte & 0x7F) << shift
+                    if byte < 0x80:
+                        break
+                    shift += 7
+                yield (ID, symbol)
+            else:
+                kind = CODIGOS_SCANNER.get(code)
+                if kind is not None:
+                    yield (kind, 0)
+
+    def iter_text_tokens(self):
+        """
+        Tokens del formato de texto <codigo> / <codigo, id>, línea a línea
+        """
+        if isinstance(self.scanner_output, str):
+            lines = self.scanner_output.strip().split("\n")
+        else:
+            lines = self.scanner_output
 
         for line in lines:
             line = line.strip()
@@ -40,33 +202,399 @@ class TokenParser:
             if line.startswith("<") and line.endswith(">"):
                 token_content = line[1:-1]  # Remover < y >
 
-                # Token simple <codigo>
+                # Token simple <codigo> (<20> es un identificador sin id)
                 if "," not in token_content:
                     code = token_content
                     if code in TOKEN_MAP:
-                        token_type = TOKEN_MAP[code]
-                        self.tokens.append((token_type, token_type))
+                        yield (TOKEN_MAP[code], 0)
+                    elif code == IDENTIFIER_CODE:
+                        yield (ID, 0)
 
                 # Token con ID <codigo, id> (identificadores)
                 else:
                     parts = token_content.split(",")
                     code = parts[0].strip()
-                    if code == "20":  # Identificador
-                        self.tokens.append(("id", f"id_{parts[1].strip()}"))
+                    if code == IDENTIFIER_CODE:  # Identificador
+                        yield (ID, int(parts[1]))
 
-        return self.tokens
 
+def tokens_desde_scanner(scanner, avance=None):
+    """
+    Adapta el generador de tokens tipados del Scanner a tokens del parser.
+    Con `avance` (Avance) anota hasta dónde se ha leído la entrada
+    """
+    if scanner.workers > 1 and avance is None and scanner.stats is None:
+        yield from tokens_de_segmentos(scanner.pooled_segments(scanner.input_text))
+        return
+
+    tokens = scanner.tokens()
+    if avance is not None:
+        tokens = avance.seguir(tokens)
+    for token in tokens:
+        if token.code == IDENTIFIER_ID:
+            yield (ID, token.symbol)
+        else:
+            kind = CODIGOS_SCANNER.get(token.code)
+            if kind is not None:
+                yield (kind, 0)
+
+
+def tokens_de_segmentos(segmentos):
+    """
+    Tokens del parser de los segmentos en arrays del scanner paralelo
+    (Scanner.pooled_segments), sin crear un Token por token
+    """
+    for codes, symbols, _, _ in segmentos:
+        kinds = codes.translate(_TABLA_CODIGOS)
+        if _SIN_TIPO in kinds:
+            yield from ((kind, symbol) for kind, symbol in zip(kinds, symbols)
+                        if kind != _SIN_TIPO)
+        else:
+            yield from zip(kinds, symbols)
+
+
+class Muestreo(NamedTuple):
+    """
+    Opciones del modo muestreo: parar tras `max_tokens` tokens, cuando el
+    paradigma y la certeza no cambian en `ventana` tokens, o analizar solo
+    los primeros `max_chars` caracteres o `max_bytes` bytes (UTF-8) de la
+    entrada. Con `max_bytes` la fracción leída también se mide en bytes
+    """
+
+    max_tokens: int = None
+    ventana: int = None
+    max_chars: int = None
+    max_bytes: int = None
+
+
+class Recuperacion(NamedTuple):
+    """
+    Opciones de recovery del parser: `modo` es uno de RECOVERY_MODES y
+    `max_errores` corta el análisis en modo pánico tras tantos errores
+    """
+
+    modo: str = "best_match"
+    max_errores: int = None
+
+
+class ParadaTemprana(Exception):
+    """Interrumpe el parse al cumplirse una condición de muestreo"""
+
+
+class PresupuestoAgotado(Exception):
+    """Interrumpe el parse en modo pánico al superar max_errores"""
+
+
+class Avance:
+    """
+    Parte de la entrada que ha consumido el parser, para escalar el % de
+    lectura cuando solo se analiza una muestra
+    """
+
+    def __init__(self, total=None):
+        self.total = total  # caracteres de la entrada completa, si se conocen
+        self.fin = 0  # final del último token leído
+        self.recortado = False
+        # Con medir_bytes(): bloques que `fin` aún no ha superado, como
+        # (inicio en caracteres, inicio en bytes, texto)
+        self.bloques = None
+
+    def fraccion(self):
+        if not self.total:
+            return 1.0
+        fin = self.fin if self.bloques is None else self.fin_en_bytes()
+        return min(fin / self.total, 1.0)
+
+    def medir_bytes(self, texto):
+        """
+        Anota el tamaño UTF-8 de un str o de cada uno de sus bloques:
+        `total` pasa a contar bytes (p. ej. el tamaño del archivo) y la
+        fracción leída se mide igual
+        """
+        if isinstance(texto, str):
+            self.bloques = deque([(0, 0, texto)])
+            return texto
+        return self.medir_bloques(texto)
+
+    def medir_bloques(self, bloques):
+        self.bloques = deque()
+        caracteres = octetos = 0
+        for bloque in bloques:
+            # Los bloques que ya quedaron por detrás de `fin` no hacen falta
+            while self.bloques and self.bloques[0][0] + len(self.bloques[0][2]) < self.fin:
+                self.bloques.popleft()
+            self.bloques.append((caracteres, octetos, bloque))
+            caracteres += len(bloque)
+            octetos += len(bloque.encode("utf-8"))
+            yield bloque
+
+    def fin_en_bytes(self):
+        """`fin` (un offset en caracteres) convertido a bytes UTF-8"""
+        octetos = 0
+        for inicio, octetos, bloque in self.bloques:
+            if self.fin <= inicio + len(bloque):
+                return octetos + len(bloque[:self.fin - inicio].encode("utf-8"))
+            octetos += len(bloque.encode("utf-8"))
+        return octetos
+
+    def seguir(self, tokens):
+        """Anota el final de cada token tipado que pasa"""
+        for token in tokens:
+            self.fin = token.end
+            yield token
+
+    def recortar(self, texto, max_chars):
+        """Los primeros `max_chars` caracteres de un str o de sus bloques"""
+        if isinstance(texto, str):
+            self.recortado = len(texto) > max_chars
+            return texto[:max_chars]
+        return self.recortar_bloques(texto, max_chars)
+
+    def recortar_bloques(self, bloques, restante):
+        for bloque in bloques:
+            if restante <= 0:
+                if bloque:
+                    self.recortado = True
+                    return
+                continue
+            if len(bloque) > restante:
+                self.recortado = True
+                yield bloque[:restante]
+                return
+            restante -= len(bloque)
+            yield bloque
+
+    def recortar_bytes(self, texto, max_bytes):
+        """
+        Los primeros `max_bytes` bytes UTF-8 de un str o de sus bloques,
+        sin partir un carácter
+        """
+        if isinstance(texto, str):
+            datos = texto.encode("utf-8")
+            self.recortado = len(datos) > max_bytes
+            return datos[:max_bytes].decode("utf-8", "ignore")
+        return self.recortar_bloques_bytes(texto, max_bytes)
+
+    def recortar_bloques_bytes(self, bloques, restante):
+        for bloque in bloques:
+            if restante <= 0:
+                if bloque:
+                    self.recortado = True
+                    return
+                continue
+            datos = bloque.encode("utf-8")
+            if len(datos) > restante:
+                self.recortado = True
+                yield datos[:restante].decode("utf-8", "ignore")
+                return
+            restante -= len(datos)
+            yield bloque
+
+
+# Resultado de una entrada sin tokens, sea cual sea el camino de análisis
+RESULTADO_VACIO = Result("TEXT", 90, 100.0)
+
+
+class Contadores(NamedTuple):
+    """
+    Contadores de un análisis de los que sale su Result, para puntuar
+    muchos archivos a la vez (batch_scoring.py). `leidos` es la posición
+    final del parser y `fraccion` la parte de la entrada analizada
+    """
+
+    clases: int
+    funciones: int
+    procesados: int
+    programacion: int
+    errores: int
+    total: int
+    leidos: int
+    fraccion: float = 1.0
+
+
+class Puntuacion:
+    """
+    Clasificación a partir de los contadores del mejor match (clases,
+    funciones, tokens procesados, errores...). La comparten el parser y el
+    contador de una pasada, que rellenan los mismos atributos
+    """
+
+    def calcular_porcentaje_lectura(self):
+        """Calcula el porcentaje de código leído/procesado"""
+        if self.tokens_total == 0:
+            return 100.0
+
+        porcentaje = (self.posicion_leida() / self.tokens_total) * 100
+        if self.muestreado or (self.avance is not None and self.avance.recortado):
+            porcentaje *= self.fraccion_leida()
+        return min(round(porcentaje, 1), 100.0)
+
+    def posicion_leida(self):
+        """
+        Tokens leídos hasta el mejor match, sin contar los que el modo
+        pánico descartó sin procesar
+        """
+        return max(self.best_match_position, self.position) - self.tokens_descartados
+
+    def fraccion_leida(self):
+        """Fracción de la entrada completa que llegó al parser"""
+        if self.avance is not None:
+            return self.avance.fraccion()
+        if self.tokens_conocidos:
+            return min(self.position / self.tokens_conocidos, 1.0)
+        return 1.0
+
+    def calcular_certeza(self, paradigma):
+        """Calcula el porcentaje de certeza de la clasificación"""
+        if self.tokens_total == 0:
+            return 50
+
+        # Factor 1: Porcentaje de tokens procesados exitosamente (40%)
+        ratio_procesados = min(
+            self.best_match_tokens_procesados / self.tokens_total, 1.0
+        )
+        factor_procesado = ratio_procesados * 40
+
+        # Factor 2: Fuerza de las características encontradas (35%)
+        total_caracteristicas = self.best_match_clases + self.best_match_funciones
+
+        if paradigma == "OOP":
+            if self.best_match_clases > 0:
+                factor_caracteristicas = min(
+                    (self.best_match_clases / max(total_caracteristicas, 1)) * 35, 35
+                )
+            else:
+                factor_caracteristicas = 0
+        elif paradigma == "PP":
+            if self.best_match_funciones > 0:
+                factor_caracteristicas = min(
+                    (self.best_match_funciones / max(total_caracteristicas, 1)) * 35, 35
+                )
+            else:
+                factor_caracteristicas = 0
+        elif paradigma == "HYB":
+            if self.best_match_clases > 0 and self.best_match_funciones > 0:
+                balance = min(self.best_match_clases, self.best_match_funciones) / max(
+                    total_caracteristicas, 1
+                )
+                factor_caracteristicas = balance * 35
+            else:
+                factor_caracteristicas = 0
+        else:  # TEXT
+            if total_caracteristicas == 0:
+                factor_caracteristicas = 25
+            else:
+                factor_caracteristicas = max(0, 25 - (total_caracteristicas * 2))
+
+        # Factor 3: Coherencia estructural (15%)
+        factor_coherencia = max(5, 15 - (self.errores_sintacticos * 1.5))
+
+        # Factor 4: Densidad de tokens de programación (10%)
+        if self.tokens_total > 0:
+            ratio_programacion = self.tokens_programacion_validos / self.tokens_total
+            factor_densidad = ratio_programacion * 10
+        else:
+            factor_densidad = 0
+
+        # Cálculo final
+        certeza_total = (
+            factor_procesado
+            + factor_caracteristicas
+            + factor_coherencia
+            + factor_densidad
+        )
 
-class RecursiveDescentParser:
+        # Ajustes específicos por paradigma
+        if paradigma == "TEXT":
+            if ratio_procesados < 0.3:
+                certeza_total = min(certeza_total + 10, 85)
+        elif paradigma in ["OOP", "PP", "HYB"]:
+            if total_caracteristicas < 1:
+                certeza_total *= 0.8
+
+        return max(15, min(round(certeza_total), 90))
+
+    def paradigma_mejor_match(self):
+        """Paradigma según las características del mejor match"""
+        if self.best_match_clases == 0 and self.best_match_funciones == 0:
+            paradigma = "TEXT"
+        elif self.best_match_clases > 0 and self.best_match_funciones > 0:
+            paradigma = "HYB"
+        elif self.best_match_clases > 0:
+            paradigma = "OOP"
+        elif self.best_match_funciones > 0:
+            paradigma = "PP"
+        else:
+            paradigma = "TEXT"
+        return paradigma
+
+    def clasificar_mejor_match(self):
+        """Clasificación basada en el mejor match encontrado"""
+        if self.tokens_total == 0:
+            return RESULTADO_VACIO
+        paradigma = self.paradigma_mejor_match()
+        certeza = self.calcular_certeza(paradigma)
+        lectura = self.calcular_porcentaje_lectura()
+        return paradigma, certeza, lectura
+
+    def contadores(self):
+        """Contadores que usa clasificar_mejor_match(), como Contadores"""
+        fraccion = 1.0
+        if self.muestreado or (self.avance is not None and self.avance.recortado):
+            fraccion = self.fraccion_leida()
+        return Contadores(
+            self.best_match_clases, self.best_match_funciones,
+            self.best_match_tokens_procesados, self.tokens_programacion_validos,
+            self.errores_sintacticos, self.tokens_total,
+            self.posicion_leida(), fraccion,
+        )
+
+
+class RecursiveDescentParser(Puntuacion):
     """
     Recursive Descent Parser
+
+    Acepta cualquier iterable de tokens (TokenStore, lista o generador de
+    pares (tipo, símbolo)) y los consume bajo demanda, sin copiarlos. El
+    motor "iterative" recorre la gramática con una pila explícita;
+    "recursive" usa los procedimientos recursivos.
     """
 
-    def __init__(self, tokens):
-        self.tokens = tokens + [("$", "$")]
+    def __init__(self, tokens, engine="iterative", stats=None, max_tokens=None,
+                 ventana=None, avance=None, recovery="best_match", max_errores=None):
+        if engine not in PARSER_ENGINES:
+            raise ValueError(f"Motor de parser desconocido: {engine!r}")
+        if recovery not in RECOVERY_MODES:
+            raise ValueError(f"Recovery desconocido: {recovery!r}")
+        if recovery == "panic" and engine != "iterative":
+            raise ValueError("El modo pánico requiere el motor iterativo")
+        self.engine = engine
+        self.recovery = recovery
+        # Errores que el modo pánico recupera antes de abandonar el parse
+        self.max_errores = max_errores
+        self.tokens_descartados = 0
+        self.presupuesto_agotado = False
+        # stats.Stats opcional: tiempos de parse/score y recoveries
+        self.stats = stats
+
+        # Modo muestreo (ver Muestreo): el parse se detiene antes del final
+        # y el % de lectura se escala por la fracción de entrada consumida
+        self.max_tokens = max_tokens
+        self.ventana = ventana
+        self.avance = avance
+        self.tokens_conocidos = len(tokens) if hasattr(tokens, "__len__") else None
+        self.muestreado = False
+        self.muestra = None
+        self.inicio_estable = 0
+        self.proximo_control = float("inf")
         self.position = 0
-        self.current_token = self.tokens[0] if self.tokens else ("$", "$")
-        self.tokens_total = len(self.tokens) - 1  # Excluir EOF
+        self.programar_control()
+
+        self.tokens = iter(tokens)
+        self.current_token = next(self.tokens, EOF_TOKEN)
+        self.current_kind = self.current_token[0]
+        # Se conoce al terminar parse(), cuando el stream se agota
+        self.tokens_total = 0
 
         # Contadores para clasificación (best match tracking)
         self.clases_encontradas = 0
@@ -87,16 +615,55 @@ class RecursiveDescentParser:
 
     def get_next_token(self):
         """Obtiene el siguiente token del scanner"""
-        self.position += 1
-        if self.position < len(self.tokens):
-            self.current_token = self.tokens[self.position]
+        if self.current_token is not EOF_TOKEN:
+            self.position += 1
+            if self.position >= self.proximo_control:
+                self.controlar_muestreo()
+            self.current_token = next(self.tokens, EOF_TOKEN)
+            self.current_kind = self.current_token[0]
         return self.current_token
 
-    def match(self, expected_token):
+    def programar_control(self):
+        """Posición del próximo control de muestreo"""
+        proximo = float("inf")
+        if self.ventana:
+            proximo = self.position + max(1, self.ventana // 8)
+        if self.max_tokens is not None:
+            proximo = min(proximo, self.max_tokens)
+        self.proximo_control = proximo
 
-        if self.current_token[0] == expected_token:
+    def controlar_muestreo(self):
+        """
+        Lanza ParadaTemprana al llegar a max_tokens o cuando la
+        clasificación de lo leído lleva `ventana` tokens sin cambiar
+        """
+        if self.max_tokens is not None and self.position >= self.max_tokens:
+            raise ParadaTemprana
+
+        if self.ventana:
+            self.tokens_total = self.position
+            paradigma = self.paradigma_mejor_match()
+            actual = (paradigma, self.calcular_certeza(paradigma))
+            if actual != self.muestra:
+                self.muestra = actual
+                self.inicio_estable = self.position
+            elif self.position - self.inicio_estable >= self.ventana:
+                raise ParadaTemprana
+
+        self.programar_control()
+
+    def contar_tokens_restantes(self):
+        """Agota el stream para conocer el total de tokens (excluye EOF)"""
+        restantes = 0
+        if self.current_token is not EOF_TOKEN:
+            restantes = 1 + sum(1 for _ in self.tokens)
+        self.tokens_total = self.position + restantes
+
+    def match(self, expected_kind):
+
+        if self.current_kind == expected_kind:
             self.tokens_procesados_exitosamente += 1
-            if expected_token in ["class", "id", "{", "}", "(", ")"]:
+            if expected_kind in TOKENS_PROGRAMACION:
                 self.tokens_programacion_validos += 1
             self.get_next_token()
             self.update_best_match()
@@ -117,6 +684,9 @@ class RecursiveDescentParser:
         """
         Recovery
         """
+        if self.stats is not None:
+            self.stats.recoveries += 1
+
         if self.recovery_attempts >= self.max_recovery_attempts:
             return
 
@@ -124,43 +694,160 @@ class RecursiveDescentParser:
         self.update_best_match()
 
         # Tokens de sincronización
-        sync_tokens = {"class", "id", "{", "}", "(", ")", "$"}
+        sync_tokens = {CLASS, FUNC, ID, LBRACE, RBRACE, LPAREN, RPAREN, EOF}
 
         # Buscar token de sincronización
-        while self.current_token[0] not in sync_tokens and self.current_token[0] != "$":
+        while self.current_kind not in sync_tokens and self.current_kind != EOF:
             self.get_next_token()
-            if self.position >= len(self.tokens):
-                break
 
         self.update_best_match()
 
+    # =====================================================
+    # MOTOR ITERATIVO (PILA EXPLÍCITA)
+    # =====================================================
+
+    def parse_iterativo(self):
+        """
+        Recorre la gramática con una pila explícita de símbolos enteros.
+        Cada no terminal se expande con la tabla LL(1) generada en
+        grammar.py, que elige lo mismo que su procedimiento recursivo, así
+        que los contadores coinciden; la pila crece solo con el anidamiento
+        de llaves y no con la recursión de Python.
+        """
+        tabla = _TABLA_LL1
+        base = _BASE_NO_TERMINALES
+        pila = [_INICIAL]
+        while pila:
+            simbolo = pila.pop()
+
+            if simbolo < NUM_TERMINALES:
+                self.match(simbolo)
+            elif simbolo == _ACCION_CLASE:
+                self.clases_encontradas += 1
+                self.update_best_match()
+            elif simbolo == _ACCION_FUNCION:
+                self.funciones_encontradas += 1
+                self.update_best_match()
+            else:
+                cuerpo = tabla[(simbolo - base) * NUM_TERMINALES + self.current_kind]
+                if cuerpo is None:
+                    self.best_match_recovery()
+                else:
+                    pila.extend(cuerpo)
+
+    def parse_panico(self):
+        """
+        Motor iterativo con recovery en modo pánico (conjuntos como bitsets):
+
+        - no terminal sin entrada en la tabla: si el token está en su
+          FOLLOW se desapila (se asume ε); si no, se descarta el token y
+          los siguientes que no están en su conjunto de sincronización
+          (FIRST ∪ FOLLOW ∪ EOF), y se reintenta si el token quedó en FIRST;
+        - terminal que no coincide: se descarta el token actual y se
+          empareja si el siguiente coincide; si no, se abandona el terminal;
+        - tokens sobrantes tras una S completa: se descarta uno y se
+          vuelve a empezar.
+
+        Todo error consume un token o desapila un símbolo; como la
+        gramática no tiene recursión por la izquierda, los símbolos
+        apilados entre dos consumos están acotados y el coste es O(tokens).
+        """
+        tabla = _TABLA_LL1
+        base = _BASE_NO_TERMINALES
+        first = _FIRST_BITS
+        follow = _FOLLOW_BITS
+        sync = _SYNC_BITS
+        pila = [_INICIAL]
+        while True:
+            while pila:
+                simbolo = pila.pop()
+
+                if simbolo < NUM_TERMINALES:
+                    if self.current_kind != simbolo:
+                        self.error_panico()
+                    if self.current_kind == simbolo:
+                        self.match(simbolo)
+                elif simbolo == _ACCION_CLASE:
+                    self.clases_encontradas += 1
+                    self.update_best_match()
+                elif simbolo == _ACCION_FUNCION:
+                    self.funciones_encontradas += 1
+                    self.update_best_match()
+                else:
+                    fila = simbolo - base
+                    cuerpo = tabla[fila * NUM_TERMINALES + self.current_kind]
+                    if cuerpo is not None:
+                        pila.extend(cuerpo)
+                        continue
+
+                    if follow[fila] >> self.current_kind & 1:
+                        self.registrar_error()
+                        continue
+
+                    self.error_panico()
+                    while not sync[fila] >> self.current_kind & 1:
+                        self.descartar_token()
+                    if first[fila] >> self.current_kind & 1:
+                        pila.append(simbolo)
+
+            if self.current_kind == EOF:
+                return
+
+            # Sobran tokens tras una S completa: se descarta uno y se
+            # vuelve a empezar
+            self.error_panico()
+            pila.append(_INICIAL)
+
+    def error_panico(self):
+        """Registra un error del modo pánico y descarta el token actual"""
+        self.registrar_error()
+        self.descartar_token()
+
+    def registrar_error(self):
+        """Cuenta un error del modo pánico y aplica el presupuesto"""
+        self.errores_sintacticos += 1
+        self.recovery_attempts += 1
+        if self.stats is not None:
+            self.stats.recoveries += 1
+        self.update_best_match()
+        if self.max_errores is not None and self.errores_sintacticos > self.max_errores:
+            raise PresupuestoAgotado
+
+    def descartar_token(self):
+        """Salta el token actual sin procesarlo (nunca avanza más allá de EOF)"""
+        if self.current_kind != EOF:
+            self.tokens_descartados += 1
+            self.get_next_token()
+
     # =====================================================
     # PROCEDIMIENTOS RECURSIVOS
     # =====================================================
+    # Los conjuntos de los docstrings son los que grammar.py calcula para
+    # GRAMATICA_CLASIFICADOR (FIRST y FOLLOW de este módulo)
 
     def S_procedure(self):
         """
         S -> DCL S'
-        First(S) = First(DCL) = {class, id}
+        First(S) = First(DCL) = {class, fn, id}
         S is not nullable.
         """
-        if self.current_token[0] in ["class", "id"]:
+        if self.current_kind in FIRST["S"]:
             self.DCL_procedure()
             self.S_prime_procedure()
         else:
-            # Error: S must start with 'class' or 'id' based on the grammar
+            # Error: S must start with 'class', 'fn' or 'id' based on the grammar
             self.best_match_recovery()
 
     def S_prime_procedure(self):
         """
         S' -> S | ε
-        First+(S' -> S) = {class, id}
+        First+(S' -> S) = {class, fn, id}
         First+(S' -> ε) = Follow(S') = { $, } }
         """
-        if self.current_token[0] in ["class", "id"]:
+        if self.current_kind in FIRST["S"]:
             # S' -> S
             self.S_procedure()
-        elif self.current_token[0] in ["$", "}"]: # Follow(S') for S' -> ε
+        elif self.current_kind in FOLLOW["S'"]: # Follow(S') for S' -> ε
             # S' -> ε
             return
         else:
@@ -168,27 +855,39 @@ class RecursiveDescentParser:
 
     def DCL_procedure(self):
         """
-        DCL -> class id { S } | id DCL''
+        DCL -> class id { S } | fn id ( TEXT ) DCL''' | id DCL''
         First+(DCL -> class id { S }) = {class}
+        First+(DCL -> fn id ( TEXT ) DCL''') = {fn}
         First+(DCL -> id DCL'') = {id}
         DCL is not nullable.
         """
-        if self.current_token[0] == "class":
+        if self.current_kind == CLASS:
             # DCL -> class id { S }
             self.clases_encontradas += 1
             self.update_best_match()
 
-            self.match("class")
-            self.match("id")
-            self.match("{")
+            self.match(CLASS)
+            self.match(ID)
+            self.match(LBRACE)
             self.S_procedure()
-            self.match("}")
-        elif self.current_token[0] == "id":
+            self.match(RBRACE)
+        elif self.current_kind == FUNC:
+            # DCL -> fn id ( TEXT ) DCL'''  (def, function, fn...)
+            self.funciones_encontradas += 1
+            self.update_best_match()
+
+            self.match(FUNC)
+            self.match(ID)
+            self.match(LPAREN)
+            self.TEXT_procedure()
+            self.match(RPAREN)
+            self.DCL_triple_prime_procedure()
+        elif self.current_kind == ID:
             # DCL -> id DCL''
-            self.match("id")
+            self.match(ID)
             self.DCL_double_prime_procedure() # New procedure for DCL''
         else:
-            # Error: DCL must start with 'class' or 'id'
+            # Error: DCL must start with 'class', 'fn' or 'id'
             self.best_match_recovery()
 
     def DCL_double_prime_procedure(self): # New procedure for DCL''
@@ -199,33 +898,33 @@ class RecursiveDescentParser:
                          = {id} U First(DCL') (since TEXT is nullable)
                          = {id} U {(, {, ε}} = {id, (, {, ε}
         """
-        token = self.current_token[0]
+        kind = self.current_kind
 
-        if token == "(":
+        if kind == LPAREN:
             # Path: DCL'' -> (TEXT) DCL'''
             # This is part of "id (params) body_or_nothing" structure from DCL -> id DCL''
             self.funciones_encontradas += 1 # Count as function
             self.update_best_match()
 
-            self.match("(")
+            self.match(LPAREN)
             self.TEXT_procedure()
-            self.match(")")
+            self.match(RPAREN)
             self.DCL_triple_prime_procedure()
-        elif token == "id":
+        elif kind == ID:
             # Path: DCL'' -> TEXT DCL' where TEXT starts with 'id'
             # This is part of "id id ..." structure
             self.TEXT_procedure() # Will consume 'id' and then TEXT'
             self.DCL_prime_procedure()
-        elif token == "{":
+        elif kind == LBRACE:
             # Path: DCL'' -> TEXT DCL' where TEXT -> ε and DCL' starts with '{'
             # This is part of "id {S}" structure
             self.TEXT_procedure() # TEXT -> ε
             self.DCL_prime_procedure() # DCL' -> {S} ...
         # Case where DCL'' -> TEXT DCL' and TEXT -> ε and DCL' -> ε. So DCL'' -> ε.
-        # Check Follow(DCL'') = { class, id, $, } }
+        # Check Follow(DCL'') = { class, fn, id, $, } }
         # 'id' and potential '(' '{' are handled by specific productions of TEXT or DCL'.
         # Remaining tokens in Follow(DCL'') indicate DCL'' -> ε.
-        elif token in ["class", "$", "}"]: # Follow(DCL'') for DCL'' -> ε (via TEXT->ε and DCL'->ε)
+        elif kind in FOLLOW["DCL''"]: # Follow(DCL'') for DCL'' -> ε (via TEXT->ε and DCL'->ε)
             self.TEXT_procedure()    # Must take TEXT -> ε path
             self.DCL_prime_procedure() # Must take DCL' -> ε path
         else:
@@ -235,14 +934,14 @@ class RecursiveDescentParser:
         """
         DCL''' -> { S } | ε
         First+(DCL''' -> { S }) = {{ }
-        First+(DCL''' -> ε) = Follow(DCL''') = { class, id, $, } }
+        First+(DCL''' -> ε) = Follow(DCL''') = { class, fn, id, $, } }
         """
-        if self.current_token[0] == "{":
+        if self.current_kind == LBRACE:
             # DCL''' -> { S }
-            self.match("{")
+            self.match(LBRACE)
             self.S_procedure()
-            self.match("}")
-        elif self.current_token[0] in ["class", "id", "$", "}"]: # Follow(DCL''') for DCL''' -> ε
+            self.match(RBRACE)
+        elif self.current_kind in FOLLOW["DCL'''"]: # Follow(DCL''') for DCL''' -> ε
             # DCL''' -> ε
             return
         else:
@@ -253,26 +952,26 @@ class RecursiveDescentParser:
         DCL' -> { S } | (TEXT) { S } | ε
         First+(DCL' -> { S }) = {{ }
         First+(DCL' -> (TEXT) { S }) = {( }
-        First+(DCL' -> ε) = Follow(DCL') = { class, id, $, } }
+        First+(DCL' -> ε) = Follow(DCL') = { class, fn, id, $, } }
         """
-        if self.current_token[0] == "{":
+        if self.current_kind == LBRACE:
             # DCL' -> { S }
-            self.match("{")
+            self.match(LBRACE)
             self.S_procedure()
-            self.match("}")
-        elif self.current_token[0] == "(":
+            self.match(RBRACE)
+        elif self.current_kind == LPAREN:
             # DCL' -> (TEXT) { S }
             # This structure `(...) {S}` might also be counted as a function-like construct
             self.funciones_encontradas += 1 # As per original code's intent
             self.update_best_match()
 
-            self.match("(")
+            self.match(LPAREN)
             self.TEXT_procedure()
-            self.match(")")
-            self.match("{")
+            self.match(RPAREN)
+            self.match(LBRACE)
             self.S_procedure()
-            self.match("}")
-        elif self.current_token[0] in ["class", "id", "$", "}"]: # Follow(DCL') for DCL' -> ε
+            self.match(RBRACE)
+        elif self.current_kind in FOLLOW["DCL'"]: # Follow(DCL') for DCL' -> ε
             # DCL' -> ε
             return
         else:
@@ -282,16 +981,16 @@ class RecursiveDescentParser:
         """
         TEXT -> id TEXT' | ε
         First+(TEXT -> id TEXT') = {id}
-        First+(TEXT -> ε) = Follow(TEXT) = { ), (, {, class, id, $, } }
+        First+(TEXT -> ε) = Follow(TEXT) = { ), (, {, class, fn, id, $, } }
         """
-        if self.current_token[0] == "id":
+        if self.current_kind == ID:
             # TEXT -> id TEXT'
-            self.match("id")
+            self.match(ID)
             self.TEXT_prime_procedure()
         # Check for TEXT -> ε using Follow(TEXT).
         # 'id' is already handled by the 'if' branch.
         # So, for ε, current_token must be in Follow(TEXT) - {id}.
-        elif self.current_token[0] in [")", "(", "{", "class", "$", "}"]: # Follow(TEXT) excluding 'id'
+        elif self.current_kind in FOLLOW["TEXT"]: # Follow(TEXT); 'id' is handled above
             # TEXT -> ε
             return
         else:
@@ -301,15 +1000,15 @@ class RecursiveDescentParser:
         """
         TEXT' -> TEXT | ε
         First(TEXT) = {id, ε}. If current_token is 'id', choose TEXT' -> TEXT.
-        First+(TEXT' -> ε) = Follow(TEXT') = { ), (, {, class, id, $, } }
+        First+(TEXT' -> ε) = Follow(TEXT') = { ), (, {, class, fn, id, $, } }
         """
-        if self.current_token[0] == "id":
+        if self.current_kind == ID:
             # TEXT' -> TEXT
             self.TEXT_procedure()
         # Check for TEXT' -> ε using Follow(TEXT').
         # 'id' is handled by the 'if' branch.
         # So, for ε, current_token must be in Follow(TEXT') - {id}.
-        elif self.current_token[0] in [")", "(", "{", "class", "$", "}"]: # Follow(TEXT') excluding 'id'
+        elif self.current_kind in FOLLOW["TEXT'"]: # Follow(TEXT'); 'id' is handled above
             # TEXT' -> ε
             return
         else:
@@ -324,195 +1023,526 @@ class RecursiveDescentParser:
         Función principal del parser
         Comienza con el símbolo inicial S
         """
-        self.S_procedure()
+        if self.stats is not None:
+            with self.stats.phase("parse"):
+                self.recorrer()
+            with self.stats.phase("score"):
+                return self.clasificar_mejor_match()
+
+        self.recorrer()
+        return self.clasificar_mejor_match()
+
+    def recorrer(self):
+        """Recorre todo el stream (o la muestra) con el motor elegido"""
+        try:
+            if self.engine == "recursive":
+                self.S_procedure()
+            elif self.recovery == "panic":
+                self.parse_panico()
+            else:
+                self.parse_iterativo()
+        except PresupuestoAgotado:
+            # El resto del stream se cuenta como no leído
+            self.presupuesto_agotado = True
+        except ParadaTemprana:
+            # El resto del stream no se lee: el total es lo consumido
+            self.muestreado = True
+            self.tokens_total = self.position
+            self.update_best_match()
+            return
 
         # Verificar si llegamos al final exitosamente
-        if self.current_token[0] == "$":
+        if self.current_kind == EOF:
             self.update_best_match()
 
-        return self.clasificar_mejor_match()
+        self.contar_tokens_restantes()
 
-    # =====================================================
-    # SISTEMA DE CLASIFICACIÓN Y CÁLCULO DE MÉTRICAS
-    # =====================================================
 
-    def calcular_porcentaje_lectura(self):
-        """Calcula el porcentaje de código leído/procesado"""
-        if self.tokens_total == 0:
-            return 100.0
+# Tokens que ContadorRapido guarda como mucho para volver al parser (unos
+# 5 bytes por token en el TokenStore)
+LIMITE_BUFFER_RAPIDO = 1 << 16
 
-        posicion_final = max(self.best_match_position, self.position)
-        porcentaje = (posicion_final / self.tokens_total) * 100
-        return min(round(porcentaje, 1), 100.0)
+# Estados del contador de una pasada
+(_DECLARACION, _NOMBRE_CLASE, _LLAVE_CLASE, _NOMBRE_FUNCION, _PAREN_FUNCION,
+ _IDS, _PARAMETROS, _CUERPO_OPCIONAL, _CUERPO) = range(9)
 
-    def calcular_certeza(self, paradigma):
-        """Calcula el porcentaje de certeza de la clasificación"""
-        if self.tokens_total == 0:
-            return 50
 
-        # Factor 1: Porcentaje de tokens procesados exitosamente (40%)
-        ratio_procesados = min(
-            self.best_match_tokens_procesados / self.tokens_total, 1.0
-        )
-        factor_procesado = ratio_procesados * 40
+class ContadorRapido(Puntuacion):
+    """
+    Clasificador de una pasada sobre el stream de tokens: una máquina de
+    estados que sigue la profundidad de llaves y cuenta las formas
+    `class id { ... }`, `fn id ( ... )` e `id ( ... )` sin pila de
+    gramática ni best match.
+
+    Solo reconoce entradas sin errores sintácticos; en ellas el parser
+    empareja todos los tokens y sus contadores coinciden con los de aquí.
+    Ante cualquier token que el parser trataría como error, contar()
+    devuelve False y resto() da el stream completo para el parser.
+
+    Con `limite` se guardan como mucho `limite` tokens: pasado el límite,
+    si la entrada se puede volver a leer (`releible`) se sigue contando
+    sin guardar y resto() devuelve None; si no, contar() se rinde y
+    resto() da el stream intacto.
+    """
 
-        # Factor 2: Fuerza de las características encontradas (35%)
-        total_caracteristicas = self.best_match_clases + self.best_match_funciones
+    def __init__(self, tokens, limite=None, releible=False):
+        self.tokens = iter(tokens)
+        # Tokens ya leídos, por si hay que volver al parser
+        self.leidos = TokenStore()
+        self.limite = limite
+        self.releible = releible
+        self.desbordado = False
 
-        if paradigma == "OOP":
-            if self.best_match_clases > 0:
-                factor_caracteristicas = min(
-                    (self.best_match_clases / max(total_caracteristicas, 1)) * 35, 35
-                )
-            else:
-                factor_caracteristicas = 0
-        elif paradigma == "PP":
-            if self.best_match_funciones > 0:
-                factor_caracteristicas = min(
-                    (self.best_match_funciones / max(total_caracteristicas, 1)) * 35, 35
-                )
-            else:
-                factor_caracteristicas = 0
-        elif paradigma == "HYB":
-            if self.best_match_clases > 0 and self.best_match_funciones > 0:
-                balance = min(self.best_match_clases, self.best_match_funciones) / max(
-                    total_caracteristicas, 1
-                )
-                factor_caracteristicas = balance * 35
-            else:
-                factor_caracteristicas = 0
-        else:  # TEXT
-            if total_caracteristicas == 0:
-                factor_caracteristicas = 25
+        self.clases_encontradas = 0
+        self.funciones_encontradas = 0
+        self.tokens_total = 0
+        self.errores_sintacticos = 0
+        self.tokens_descartados = 0
+        self.muestreado = False
+        self.avance = None
+
+    def contar(self):
+        """True si toda la entrada se reconoció (contadores completos)"""
+        total = clases = funciones = profundidad = ids = 0
+        opcional = False
+        estado = _DECLARACION
+        for kind, symbol in self.guardados():
+            total += 1
+
+            if estado == _IDS:
+                if kind == ID:
+                    ids += 1
+                    continue
+                if kind == LPAREN:
+                    # id ( TEXT ) [{ S }]; tras varios ids el cuerpo es obligatorio
+                    funciones += 1
+                    opcional = ids == 1
+                    estado = _PARAMETROS
+                    continue
+                if kind == LBRACE:
+                    profundidad += 1
+                    estado = _DECLARACION
+                    continue
+                estado = _DECLARACION  # fin de la declaración
+            elif estado == _PARAMETROS:
+                if kind == ID:
+                    continue
+                if kind != RPAREN:
+                    return False
+                estado = _CUERPO_OPCIONAL if opcional else _CUERPO
+                continue
+            elif estado == _CUERPO_OPCIONAL:
+                if kind == LBRACE:
+                    profundidad += 1
+                    estado = _DECLARACION
+                    continue
+                estado = _DECLARACION  # declaración sin cuerpo
+            elif estado == _NOMBRE_CLASE or estado == _NOMBRE_FUNCION:
+                if kind != ID:
+                    return False
+                estado += 1
+                continue
+            elif estado == _PAREN_FUNCION:
+                if kind != LPAREN:
+                    return False
+                opcional = True
+                estado = _PARAMETROS
+                continue
+            elif estado == _LLAVE_CLASE or estado == _CUERPO:
+                if kind != LBRACE:
+                    return False
+                profundidad += 1
+                estado = _DECLARACION
+                continue
+
+            # Inicio de una declaración o cierre de bloque
+            if kind == ID:
+                ids = 1
+                estado = _IDS
+            elif kind == CLASS:
+                clases += 1
+                estado = _NOMBRE_CLASE
+            elif kind == FUNC:
+                funciones += 1
+                estado = _NOMBRE_FUNCION
+            elif kind == RBRACE and profundidad:
+                profundidad -= 1
             else:
-                factor_caracteristicas = max(0, 25 - (total_caracteristicas * 2))
+                return False
+
+        if self.desbordado or profundidad or estado not in (
+                _DECLARACION, _IDS, _CUERPO_OPCIONAL):
+            return False
+
+        # Sin errores el parser empareja todos los tokens
+        self.tokens_total = self.position = self.best_match_position = total
+        self.tokens_procesados_exitosamente = self.best_match_tokens_procesados = total
+        self.tokens_programacion_validos = total
+        self.clases_encontradas = self.best_match_clases = clases
+        self.funciones_encontradas = self.best_match_funciones = funciones
+        return True
+
+    def guardados(self):
+        """Los tokens de la entrada, guardando en `leidos` hasta `limite`"""
+        leidos = self.leidos
+        for kind, symbol in islice(self.tokens, self.limite):
+            leidos.append(kind, symbol)
+            yield kind, symbol
+        if self.limite is None or len(leidos) < self.limite:
+            return
 
-        # Factor 3: Coherencia estructural (15%)
-        factor_coherencia = max(5, 15 - (self.errores_sintacticos * 1.5))
+        if not self.releible:
+            self.desbordado = True
+            return
+        self.leidos = None
+        yield from self.tokens
 
-        # Factor 4: Densidad de tokens de programación (10%)
-        if self.tokens_total > 0:
-            ratio_programacion = self.tokens_programacion_validos / self.tokens_total
-            factor_densidad = ratio_programacion * 10
-        else:
-            factor_densidad = 0
+    def resto(self):
+        """
+        El stream completo: los tokens ya leídos y los que quedan, o None
+        si se dejaron de guardar y hay que volver a leer la entrada
+        """
+        if self.leidos is None:
+            return None
+        return chain(self.leidos, self.tokens)
 
-        # Cálculo final
-        certeza_total = (
-            factor_procesado
-            + factor_caracteristicas
-            + factor_coherencia
-            + factor_densidad
-        )
 
-        # Ajustes específicos por paradigma
-        if paradigma == "TEXT":
-            if ratio_procesados < 0.3:
-                certeza_total = min(certeza_total + 10, 85)
-        elif paradigma in ["OOP", "PP", "HYB"]:
-            if total_caracteristicas < 1:
-                certeza_total *= 0.8
+# Caracteres que se leen para detectar el formato de un archivo
+SNIFF_SIZE = 64
 
-        return max(15, min(round(certeza_total), 90))
 
-    def clasificar_mejor_match(self):
-        """Clasificación basada en el mejor match encontrado"""
-        if self.best_match_clases == 0 and self.best_match_funciones == 0:
-            paradigma = "TEXT"
-        elif self.best_match_clases > 0 and self.best_match_funciones > 0:
-            paradigma = "HYB"
-        elif self.best_match_clases > 0:
-            paradigma = "OOP"
-        elif self.best_match_funciones > 0:
-            paradigma = "PP"
+def es_salida_scanner(archivo):
+    """
+    Detecta si un archivo contiene la salida del scanner (<codigo>, ...)
+    leyendo solo sus primeros caracteres no blancos
+    """
+    with open(archivo, "r", encoding="utf-8") as f:
+        inicio = ""
+        while not inicio:
+            bloque = f.read(SNIFF_SIZE)
+            if not bloque:
+                return False
+            inicio = bloque.lstrip()
+        inicio += f.read(SNIFF_SIZE)
+
+    return inicio.startswith("<") and ">" in inicio
+
+
+def es_salida_binaria(archivo):
+    """Detecta el formato binario del scanner por su número mágico"""
+    with open(archivo, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def opciones_recuperacion(recuperacion):
+    """Argumentos del parser para unas opciones de Recuperacion (o None)"""
+    if recuperacion is None:
+        return {}
+    return {"recovery": recuperacion.modo, "max_errores": recuperacion.max_errores}
+
+
+def clasificar_desde_binario(archivo_binario, stats=None, recuperacion=None):
+    """Clasifica la salida binaria del scanner, mapeada en memoria"""
+    with open(archivo_binario, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            tokens = TokenParser(datos).iter_tokens()
+            try:
+                if stats is not None:
+                    stats.chars_read += len(datos)
+                    tokens = stats.timed("token_parse", tokens)
+                parser = RecursiveDescentParser(tokens, stats=stats,
+                                                **opciones_recuperacion(recuperacion))
+                paradigma, certeza, lectura = parser.parse()
+            finally:
+                tokens.close()  # libera el memoryview antes de cerrar el mmap
+
+    return paradigma, certeza, lectura
+
+
+def clasificar_desde_scanner(archivo_scanner, cache=None, stats=None, recuperacion=None):
+    """
+    Función principal que clasifica código desde la salida del scanner.
+    Con `stats` (stats.Stats) registra tiempos y contadores del análisis.
+    Con `recuperacion` (Recuperacion) no se usa la caché
+    """
+    try:
+        # En la caché solo entran resultados reales, no los de respaldo
+        if cache is not None and recuperacion is None:
+            return cache.clasificar(archivo_scanner, analizar_salida_scanner,
+                                    tipo="tokens")
+        return analizar_salida_scanner(archivo_scanner, stats, recuperacion)
+    except OSError:
+        return "TEXT", 85, 100.0
+    except Exception:
+        return "TEXT", 80, 100.0
+
+
+def analizar_salida_scanner(archivo_scanner, stats=None, recuperacion=None):
+    """
+    Parser de un archivo de salida del scanner (texto o binaria), sin
+    caché ni resultado de respaldo: los errores de lectura o de análisis
+    se propagan
+    """
+    # Convert relative path to absolute path
+    archivo_absoluto = os.path.abspath(archivo_scanner)
+    if es_salida_binaria(archivo_absoluto):
+        return clasificar_desde_binario(archivo_absoluto, stats, recuperacion)
+
+    # Las líneas se leen bajo demanda, sin cargar el archivo completo
+    with open(archivo_absoluto, "r", encoding="utf-8") as archivo:
+        if stats is None:
+            tokens = TokenParser(archivo).iter_tokens()
         else:
-            paradigma = "TEXT"
+            lineas = stats.reading(archivo)
+            tokens = stats.timed("token_parse", TokenParser(lineas).iter_tokens())
 
-        certeza = self.calcular_certeza(paradigma)
-        lectura = self.calcular_porcentaje_lectura()
-        return paradigma, certeza, lectura
+        # Usar el Recursive Descent Parser
+        parser = RecursiveDescentParser(tokens, stats=stats,
+                                        **opciones_recuperacion(recuperacion))
+        return parser.parse()
 
 
-def leer_salida_scanner(archivo_scanner):
-    """Lee la salida del analizador léxico"""
+def classify(text, engine="dfa", symbols=None, stats=None, muestreo=None,
+             total_chars=None, recuperacion=None, profile=DEFAULT_PROFILE, rapido=True):
+    """
+    Clasifica código fuente en memoria: Scanner + Parser en el mismo proceso,
+    sin subprocesos ni archivos intermedios.
+    `text` es un str o un iterable de bloques de texto (ver read_chunks).
+    Sin `symbols` (una SymbolTable compartida) el scanner no construye
+    tabla de símbolos: la clasificación solo mira el tipo de cada token.
+    Con `stats` (stats.Stats) registra tiempos por fase y contadores.
+    Con `muestreo` (Muestreo) analiza solo una muestra y escala el % de
+    lectura por la parte de la entrada consumida; `total_chars` es el
+    tamaño de la entrada cuando `text` son bloques. Con `recuperacion`
+    (Recuperacion) se elige el modo de recovery del parser. `profile` es
+    el perfil de lenguaje (lexical_analyzer.PROFILES) del scanner.
+    Con `rapido` (y sin muestreo ni recuperacion) el código bien formado
+    se clasifica con ContadorRapido y solo el resto pasa por el parser.
+    Cualquier error devuelve un resultado TEXT (ver clasificar_texto)
+    """
     try:
-        # Convert relative path to absolute path
-        archivo_absoluto = os.path.abspath(archivo_scanner)
-        with open(archivo_absoluto, "r", encoding="utf-8") as file:
-            return file.read()
+        return clasificar_texto(text, engine, symbols, stats, muestreo, total_chars,
+                                recuperacion, profile, rapido)
     except Exception:
-        return None
+        return Result("TEXT", 80, 100.0)
 
 
-def clasificar_desde_scanner(archivo_scanner):
-    """Función principal que clasifica código desde la salida del scanner"""
-    scanner_output = leer_salida_scanner(archivo_scanner)
-    if scanner_output is None:
-        return "TEXT", 85, 100.0
-
+def clasificar_texto(text, engine="dfa", symbols=None, stats=None, muestreo=None,
+                     total_chars=None, recuperacion=None, profile=DEFAULT_PROFILE,
+                     rapido=True, total_bytes=None, releer=None):
+    """
+    classify() sin el resultado de respaldo: los errores (p. ej. un
+    UnicodeDecodeError al leer los bloques) se propagan al llamador.
+    Con muestreo, `total_bytes` da el tamaño en bytes UTF-8 de los bloques
+    (el de un archivo) en lugar de `total_chars`. `releer` devuelve de
+    nuevo la entrada (un str se relee solo): con ella ContadorRapido no
+    guarda más de LIMITE_BUFFER_RAPIDO tokens y, si al final hace falta
+    el parser, la entrada se vuelve a escanear
+    """
+    avance = None
+    if muestreo is not None:
+        if (total_bytes is None and muestreo.max_bytes is not None
+                and isinstance(text, str)):
+            total_bytes = len(text.encode("utf-8"))
+        if total_bytes is not None:
+            avance = Avance(total_bytes)
+            text = avance.medir_bytes(text)
+        else:
+            avance = Avance(len(text) if isinstance(text, str) else total_chars)
+        if muestreo.max_chars is not None:
+            text = avance.recortar(text, muestreo.max_chars)
+        if muestreo.max_bytes is not None:
+            text = avance.recortar_bytes(text, muestreo.max_bytes)
+
+    scanner = Scanner(text, engine=engine, symbols=symbols,
+                      track_symbols=symbols is not None, stats=stats, profile=profile)
+    tokens = tokens_desde_scanner(scanner, avance)
+    if stats is not None:
+        tokens = stats.timed("token_parse", tokens)
+
+    if rapido and muestreo is None and recuperacion is None:
+        if releer is None and isinstance(text, str):
+            releer = lambda: text
+        # Con stats, volver a escanear contaría dos veces los tokens
+        contador = ContadorRapido(tokens, LIMITE_BUFFER_RAPIDO,
+                                  releible=releer is not None and stats is None)
+        if stats is None:
+            reconocido = contador.contar()
+        else:
+            with stats.phase("parse"):
+                reconocido = contador.contar()
+        if reconocido:
+            if stats is None:
+                return Result(*contador.clasificar_mejor_match())
+            with stats.phase("score"):
+                return Result(*contador.clasificar_mejor_match())
+        tokens = contador.resto()
+        if tokens is None:
+            scanner = Scanner(releer(), engine=engine, symbols=symbols,
+                              track_symbols=symbols is not None, profile=profile)
+            tokens = tokens_desde_scanner(scanner)
+
+    opciones = opciones_recuperacion(recuperacion)
+    if muestreo is not None:
+        opciones.update(max_tokens=muestreo.max_tokens, ventana=muestreo.ventana,
+                        avance=avance)
+    parser = RecursiveDescentParser(tokens, stats=stats, **opciones)
+    paradigma, certeza, lectura = parser.parse()
+    return Result(paradigma, certeza, lectura)
+
+
+# Errores al leer un archivo (inexistente, ilegible, UTF-8 inválido): main()
+# los informa en lugar de dar un resultado TEXT
+ERRORES_LECTURA = (OSError, UnicodeError)
+
+
+def tokens_de_archivo(archivo_codigo):
+    """Stream de tokens de un archivo en el formato de texto del scanner"""
+    with open(archivo_codigo, "r", encoding="utf-8") as f:
+        return "\n".join(str(token) for token in Scanner(read_chunks(f)).tokens())
+
+
+def ejecutar_analisis_completo(archivo_codigo, cache=None, stats=None, muestreo=None,
+                               recuperacion=None, profile=DEFAULT_PROFILE):
+    """
+    Ejecuta el análisis completo: Scanner + Parser.
+    Con `cache` (result_cache.ResultCache) un archivo sin cambios se
+    resuelve sin volver a analizarlo. Con `muestreo` (Muestreo) solo se
+    analiza una muestra del archivo; ni con él, ni con `recuperacion`
+    (Recuperacion), ni con un `profile` distinto del de por defecto se
+    usa la caché.
+    """
     try:
-        token_parser = TokenParser(scanner_output)
-        tokens = token_parser.parse_scanner_output()
-
-        if not tokens:
-            return "TEXT", 90, 100.0
+        # En la caché solo entran resultados reales, no los de respaldo
+        if (cache is not None and muestreo is None and recuperacion is None
+                and profile == DEFAULT_PROFILE):
+            return cache.clasificar(archivo_codigo, analizar_archivo)
 
-        # Usar el Recursive Descent Parser
-        parser = RecursiveDescentParser(tokens)
-        paradigma, certeza, lectura = parser.parse()
-
-        return paradigma, certeza, lectura
+        return analizar_archivo(archivo_codigo, stats, muestreo, recuperacion, profile)
 
     except Exception:
-        return "TEXT", 80, 100.0
+        return "TEXT", 75, 100.0
 
 
-def ejecutar_analisis_completo(archivo_codigo):
-    """Ejecuta el análisis completo: Scanner + Parser"""
-    import subprocess
+def analizar_archivo(archivo_codigo, stats=None, muestreo=None, recuperacion=None,
+                     profile=DEFAULT_PROFILE, symbols=None):
+    """
+    Scanner + Parser de un archivo de código, sin caché ni resultado de
+    respaldo: los errores de lectura o de análisis se propagan. Con
+    `symbols` (una SymbolTable compartida) se internan sus identificadores
+    """
+    # Convert relative path to absolute path
+    archivo_absoluto = os.path.abspath(archivo_codigo)
+    # Sin traducir saltos de línea ("\r" es un blanco más para el scanner):
+    # así los bloques en UTF-8 suman exactamente el tamaño del archivo
+    with open(archivo_absoluto, "r", encoding="utf-8", newline="") as f:
+        # Lectura por bloques: memoria acotada en archivos grandes
+        total = os.path.getsize(archivo_absoluto) if muestreo else None
+        return clasificar_texto(read_chunks(f), symbols=symbols, stats=stats,
+                                muestreo=muestreo, recuperacion=recuperacion, profile=profile,
+                                total_bytes=total,
+                                releer=lambda: bloques_de_archivo(archivo_absoluto))
+
+
+def bloques_de_archivo(archivo_codigo):
+    """Bloques de texto de un archivo, leído como en analizar_archivo()"""
+    with open(archivo_codigo, "r", encoding="utf-8", newline="") as f:
+        yield from read_chunks(f)
+
+
+def clasificar_ruta(archivo, cache=None, stats=None, muestreo=None, recuperacion=None,
+                    profile=DEFAULT_PROFILE, estricto=False):
+    """
+    Clasifica un archivo de código o de salida del scanner (texto o
+    binaria), detectando el formato igual que main(). El muestreo y el
+    perfil de lenguaje solo se aplican a archivos de código. Los errores
+    al leer el archivo (ERRORES_LECTURA) se propagan, sea cual sea su
+    tamaño; los del análisis dan un resultado TEXT, salvo con `estricto`,
+    que también los propaga
+    """
+    # Convert relative path to absolute path
+    archivo_absoluto = os.path.abspath(archivo)
 
+    salida_scanner = es_salida_binaria(archivo_absoluto) or es_salida_scanner(archivo_absoluto)
+    usar_cache = cache is not None and recuperacion is None
     try:
-        # Convert relative path to absolute path
-        archivo_absoluto = os.path.abspath(archivo_codigo)
-        
-        subprocess.run(
-            [sys.executable, "lexical_analyzer.py", archivo_absoluto],
-            check=True,
-            capture_output=True,
-        )
-
-        # Use absolute path for output.txt in current directory
-        output_path = os.path.abspath("output.txt")
-        paradigma, certeza, lectura = clasificar_desde_scanner(output_path)
-        return paradigma, certeza, lectura
-
+        if salida_scanner:
+            if usar_cache:
+                return cache.clasificar(archivo_absoluto, analizar_salida_scanner,
+                                        tipo="tokens")
+            return analizar_salida_scanner(archivo_absoluto, stats, recuperacion)
+        if usar_cache and muestreo is None and profile == DEFAULT_PROFILE:
+            return cache.clasificar(archivo_absoluto, analizar_archivo)
+        return analizar_archivo(archivo_absoluto, stats, muestreo, recuperacion, profile)
+    except ERRORES_LECTURA:
+        raise
     except Exception:
-        return "TEXT", 75, 100.0
+        if estricto:
+            raise
+        return ("TEXT", 80, 100.0) if salida_scanner else ("TEXT", 75, 100.0)
 
 
 def main():
-    if len(sys.argv) != 2:
-        print("Uso: python syntax_analyzer.py <archivo_entrada>")
+    if len(sys.argv) < 2:
+        print("Uso: python syntax_analyzer.py [--cache RUTA] [--stats] [--max-tokens N] "
+              "[--window N] [--max-kb N] [--recovery MODO] [--max-errors N] "
+              "[--profile PERFIL] <archivo_entrada>")
         sys.exit(0)
 
-    archivo_entrada = sys.argv[1]
-
+    arg_parser = argparse.ArgumentParser(prog="syntax_analyzer.py")
+    arg_parser.add_argument("archivo_entrada")
+    arg_parser.add_argument("--cache", default=None,
+                            help="base de datos de la caché de resultados")
+    arg_parser.add_argument("--stats", action="store_true",
+                            help="imprimir tiempos y contadores en stderr")
+    arg_parser.add_argument("--max-tokens", type=int, default=None,
+                            help="analizar como mucho N tokens")
+    arg_parser.add_argument("--window", type=int, default=None,
+                            help="parar cuando el resultado no cambia en N tokens")
+    arg_parser.add_argument("--max-kb", type=float, default=None,
+                            help="analizar solo los primeros N KB")
+    arg_parser.add_argument("--recovery", choices=RECOVERY_MODES, default=None,
+                            help="modo de recovery del parser (best_match por defecto)")
+    arg_parser.add_argument("--max-errors", type=int, default=None,
+                            help="en modo panic, parar tras N errores")
+    arg_parser.add_argument("--profile", choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                            help="palabras clave del lenguaje (classic por defecto)")
+    args = arg_parser.parse_args()
+    stats = Stats() if args.stats else None
+
+    muestreo = None
+    if args.max_tokens or args.window or args.max_kb:
+        max_bytes = int(args.max_kb * 1024) if args.max_kb else None
+        muestreo = Muestreo(args.max_tokens, args.window, max_bytes=max_bytes)
+
+    recuperacion = None
+    if args.recovery or args.max_errors is not None:
+        recuperacion = Recuperacion(args.recovery or "panic", args.max_errors)
+
+    cache = None
     try:
-        # Convert relative path to absolute path
-        archivo_absoluto = os.path.abspath(archivo_entrada)
-        
-        with open(archivo_absoluto, "r", encoding="utf-8") as f:
-            contenido = f.read().strip()
-
-        if contenido.startswith("<") and ">" in contenido:
-            paradigma, certeza, lectura = clasificar_desde_scanner(archivo_absoluto)
-        else:
-            paradigma, certeza, lectura = ejecutar_analisis_completo(archivo_absoluto)
+        if args.cache:
+            import sqlite3
+
+            from result_cache import ResultCache
+            try:
+                cache = ResultCache(args.cache)
+            except sqlite3.Error as error:
+                # Sin caché el archivo se clasifica igual
+                print(f"Caché no disponible: {error}", file=sys.stderr)
+
+        paradigma, certeza, lectura = clasificar_ruta(args.archivo_entrada, cache, stats,
+                                                      muestreo, recuperacion, args.profile)
 
         print(f"{paradigma} {certeza} {lectura}")
+        if stats is not None:
+            print(stats.report(), file=sys.stderr)
 
     except Exception:
         print("Error al procesar el archivo")
+    finally:
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,45 @@
 import io
+import itertools
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
 import unittest
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import redirect_stdout
+from pathlib import Path
 
-from lexical_analyzer import Scanner   
+import syntax_analyzer
+from async_analyzer import classify_many
+from batch_analyzer import clasificar_archivo, clasificar_lote, expandir_entradas
+from batch_scoring import puntuar_lote, resultados
+from benchmarks.corpus import CORPUS, generar
+from benchmarks.run import medir_corpus
+from classifier_client import consultar, direccion_tcp, linea_resultado
+from classifier_server import crear_servidor
+from grammar import (
+    CLASS, FUNC, GRAMATICA_CLASIFICADOR, ID, LBRACE, LPAREN, RBRACE, RPAREN, Gramatica,
+)
+from lexical_analyzer import (
+    BINARY_HEADER, BINARY_MAGIC, CHAR, CHAR_CLASSES, DEL, DIGIT, ENGINES, PROFILES,
+    LanguageProfile, Scanner, SymbolTable, Token, categorize_char, np,
+    read_chunks, write_binary,
+)
+from result_cache import ResultCache
+from stats import PHASES, Stats
+from syntax_analyzer import (
+    LIMITE_BUFFER_RAPIDO, PARSER_ENGINES, RECOVERY_MODES, ContadorRapido, Contadores,
+    Muestreo, Puntuacion, Recuperacion, RecursiveDescentParser, Result, TokenParser,
+    TokenStore, clasificar_desde_scanner, clasificar_ruta, classify,
+    ejecutar_analisis_completo, es_salida_binaria, es_salida_scanner, tokens_de_archivo,
+    tokens_de_segmentos, tokens_desde_scanner,
+)
 
 
 def run(text: str) -> str:
@@ -63,5 +100,1086 @@ class ScannerTests(unittest.TestCase):
             with self.subTest(source=src):
                 self.assertEqual(run(src), expected)
 
+    # Typed token stream behind the text protocol
+    def test_token_stream(self):
+        self.assertEqual(
+            list(Scanner("class A { a }").tokens()),
+            [Token(7, 0, 0, 5), Token(20, 1, 6, 7), Token(3, 0, 8, 9),
+             Token(20, 2, 10, 11), Token(4, 0, 12, 13)],
+        )
+
+    # Spans slice back to the lexeme; trailing digits survive at EOF
+    def test_spans(self):
+        src = "  foo_1\t(bar2"
+        lexemes = [src[t.start:t.end] for t in Scanner(src).tokens()]
+        self.assertEqual(lexemes, ["foo_1", "(", "bar2"])
+
+    # Precomputed ASCII class table agrees with the reference classifier
+    def test_class_table(self):
+        for code in range(128):
+            self.assertEqual(CHAR_CLASSES[code], categorize_char(chr(code)))
+        s = Scanner("")
+        self.assertEqual(s.categorize("é"), CHAR)
+        self.assertEqual(s.categorize("²"), DIGIT)
+        self.assertEqual(s.categorize("€"), DEL)
+        self.assertEqual(s.categorize(None), DEL)
+
+
+
+class EngineTests(unittest.TestCase):
+
+    SOURCES = [
+        "", "class A { f ( x ) { y } }", "class1 classy class",
+        "9abc a9b __x $$ x$y (x) 12 3x", "foo  \tbar\nbaz", "a1", "q",
+        "caf\u00e9 na\u00efve { x\u00b2 }",
+        open("text_example.txt", encoding="utf-8").read(),
+    ]
+
+    def assertMatchesDFA(self, engine):
+        for src in self.SOURCES:
+            with self.subTest(engine=engine, source=src):
+                dfa = Scanner(src)
+                other = Scanner(src, engine=engine)
+                self.assertEqual(list(other.tokens()), list(dfa.tokens()))
+                self.assertEqual(other.symbol_entry, dfa.symbol_entry)
+
+    # The DFA stays the reference: other engines must match it exactly
+    def test_regex_matches_dfa(self):
+        self.assertMatchesDFA("re")
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def test_numpy_matches_dfa(self):
+        self.assertMatchesDFA("numpy")
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Scanner("x", engine="lalr")
+
+
+class LanguageProfileTests(unittest.TestCase):
+
+    SRC = "class A { def m ( self ) : return self } function f ( ) { } fn g ( ) struct S { }"
+
+    def codes(self, src, **kwargs):
+        return [t.code for t in Scanner(src, **kwargs).tokens()]
+
+    # The default profile still only knows `class`
+    def test_classic_profile(self):
+        self.assertEqual(self.codes("def f ( ) fn"), [20, 20, 1, 2, 20])
+        self.assertEqual(Scanner("").RESERVED_KEYWORDS, {"class": 7})
+
+    def test_keywords(self):
+        self.assertEqual(self.codes("class def x", profile="python"), [7, 8, 20])
+        self.assertEqual(self.codes("struct trait fn class", profile="rust"), [7, 7, 8, 20])
+        custom = LanguageProfile("mini", {"proc": 8})
+        self.assertEqual(self.codes("proc p ( )", profile=custom), [8, 20, 1, 2])
+        with self.assertRaises(ValueError):
+            Scanner("x", profile="cobol")
+
+    def test_engines_agree(self):
+        engines = [e for e in ENGINES if e != "numpy" or np is not None]
+        for name in PROFILES:
+            expected = list(Scanner(self.SRC, profile=name).tokens())
+            for engine in engines:
+                with self.subTest(profile=name, engine=engine):
+                    self.assertEqual(
+                        list(Scanner(self.SRC, engine=engine, profile=name).tokens()), expected)
+
+    # Function keywords are counted as functions by both parser engines
+    def test_parser_counts_keyword_constructs(self):
+        src = "def a ( x ) : return x def b ( ) : pass"
+        self.assertEqual(classify(src, profile="python"), ("PP", 90, 100.0))
+        self.assertEqual(classify("struct P { x } fn f ( ) { }", profile="rust").paradigm, "HYB")
+        for engine in PARSER_ENGINES:
+            with self.subTest(engine=engine):
+                tokens = tokens_desde_scanner(Scanner(self.SRC, profile="generic"))
+                parser = RecursiveDescentParser(tokens, engine)
+                parser.parse()
+                self.assertEqual((parser.clases_encontradas, parser.funciones_encontradas),
+                                 (2, 3))
+
+    def test_text_protocol(self):
+        out = []
+        Scanner("function f ( ) { }", emit=out.append, profile="javascript").scan()
+        self.assertEqual(out[:2], ["<8>", "<20, 1>"])
+        self.assertEqual(list(TokenParser("\n".join(out)).iter_tokens())[:2],
+                         [(FUNC, 0), (ID, 1)])
+
+
+class SymbolTableTests(unittest.TestCase):
+
+    # Scanners sharing a table keep ids stable across inputs
+    def test_shared_between_scanners(self):
+        table = SymbolTable()
+        first = list(Scanner("alpha beta", symbols=table).tokens())
+        second = list(Scanner("beta gamma alpha", symbols=table).tokens())
+        self.assertEqual([t.symbol for t in first], [1, 2])
+        self.assertEqual([t.symbol for t in second], [2, 3, 1])
+        self.assertEqual(list(table), ["alpha", "beta", "gamma"])
+        self.assertEqual(table.name(3), "gamma")
+
+    def test_interned(self):
+        table = SymbolTable()
+        table.intern("".join(["na", "me"]))
+        self.assertIs(table.name(1), sys.intern("name"))
+
+    def test_serialized_round_trip(self):
+        table = SymbolTable(["x", "caf\u00e9", "y" * 200])
+        data = table.to_bytes()
+        self.assertEqual(SymbolTable.from_bytes(data), table)
+        self.assertEqual(SymbolTable.from_bytes(data)["caf\u00e9"], 2)
+        with self.assertRaises(ValueError):
+            SymbolTable.from_bytes(BINARY_HEADER + data[6:])
+
+
+class ClassifyOnlyTests(unittest.TestCase):
+
+    SRC = "class A { b ( c ) { d } } e f ( g ) x1 A b"
+
+    # No table: identifiers keep their kind and span but get symbol 0
+    def test_no_symbol_table(self):
+        engines = [e for e in ENGINES if e != "numpy" or np is not None]
+        expected = [t._replace(symbol=0) for t in Scanner(self.SRC).tokens()]
+        for engine in engines:
+            with self.subTest(engine=engine):
+                scanner = Scanner(self.SRC, engine=engine, track_symbols=False)
+                self.assertEqual(list(scanner.tokens()), expected)
+                self.assertIsNone(scanner.symbol_entry)
+
+    def test_text_protocol(self):
+        out = []
+        Scanner("class A { b }", emit=out.append, track_symbols=False).scan()
+        self.assertEqual(out, ["<7>", "<20>", "<3>", "<20>", "<4>"])
+        self.assertEqual(list(TokenParser("\n".join(out)).iter_tokens()),
+                         [(CLASS, 0), (ID, 0), (LBRACE, 0), (ID, 0), (RBRACE, 0)])
+
+    def test_same_classification(self):
+        parser = RecursiveDescentParser(tokens_desde_scanner(Scanner(self.SRC)))
+        self.assertEqual(classify(self.SRC), parser.parse())
+        self.assertEqual(classify(self.SRC, symbols=SymbolTable()), classify(self.SRC))
+
+
+class StatsTests(unittest.TestCase):
+
+    def test_counters(self):
+        stats = Stats()
+        src = "class A { f ( x ) { y } } ) ("
+        self.assertEqual(classify(src, stats=stats), classify(src))
+        self.assertEqual(stats.chars_read, len(src))
+        # One lookup per character, plus one more for each character
+        # that ends an identifier or keyword
+        self.assertEqual(stats.dfa_transitions, len(src) + 5)
+        self.assertEqual(stats.tokens_by_kind,
+                         {"class": 1, "id": 4, "{": 2, "(": 2, ")": 2, "}": 2})
+        self.assertEqual(stats.max_depth, 2)
+        self.assertGreater(stats.recoveries, 0)
+        self.assertEqual(stats.symbols, 0)
+
+    def test_phases(self):
+        stats = Stats()
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as f:
+            f.write("class A { b } " * 200)
+            f.seek(0)
+            classify(read_chunks(f, 64), symbols=SymbolTable(), stats=stats)
+        self.assertEqual(set(stats.times), set(PHASES))
+        for phase in ("read", "lex", "token_parse", "parse", "score"):
+            self.assertGreater(stats.times[phase], 0, phase)
+        self.assertEqual(stats.symbols, 2)
+        self.assertEqual(stats.as_dict()["tokens_by_kind"]["id"], 400)
+
+    # Time spent in a nested phase is not charged to the enclosing one
+    def test_exclusive_times(self):
+        stats = Stats()
+        with stats.phase("parse"):
+            list(stats.timed("lex", range(3)))
+        self.assertEqual(stats._stack, [])
+        self.assertGreater(stats.times["lex"], 0)
+        self.assertIn("recoveries:", stats.report())
+
+
+class StreamingInputTests(unittest.TestCase):
+
+    def write_temp(self, content):
+        fd, path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    # Tokens split across chunk boundaries are carried over intact
+    def test_chunks_match_whole_text(self):
+        src = "class Alpha { beta_12 ( gamma ) { delta } } caf\u00e9 x9 " * 5
+        engines = [e for e in ENGINES if e != "numpy" or np is not None]
+        for engine in engines:
+            expected = list(Scanner(src, engine=engine).tokens())
+            for size in (1, 2, 3, 7, 64):
+                with self.subTest(engine=engine, chunk_size=size):
+                    chunks = [src[i:i + size] for i in range(0, len(src), size)]
+                    self.assertEqual(
+                        list(Scanner(chunks, engine=engine).tokens()), expected)
+
+    def test_read_chunks(self):
+        path = self.write_temp("class A { b }")
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(list(read_chunks(f, 5)), ["class", " A { ", "b }"])
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(classify(read_chunks(f, 3)).paradigm, "OOP")
+
+    # The format sniff only looks at the start of the file
+    def test_sniff(self):
+        self.assertTrue(es_salida_scanner(self.write_temp("\n\n  <7>\n<20, 1>\n")))
+        self.assertTrue(es_salida_scanner(self.write_temp(" " * 300 + "<3>")))
+        self.assertFalse(es_salida_scanner(self.write_temp("class A { b }")))
+        self.assertFalse(es_salida_scanner(self.write_temp("   ")))
+
+    def test_classify_token_file(self):
+        path = self.write_temp("<7>\n<20, 1>\n<3>\n<20, 2>\n<4>\n"
+                               "Symbol Table:\nA: 1\nb: 2\n")
+        self.assertEqual(clasificar_desde_scanner(path), ("OOP", 90, 100.0))
+
+
+class ParallelLexTests(unittest.TestCase):
+
+    SRC = "class Alpha { beta_12 ( gamma ) { delta } } caf\u00e9 x9 alpha " * 40
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def chunks(self, size):
+        return [self.SRC[i:i + size] for i in range(0, len(self.SRC), size)]
+
+    # Segments lexed out of order keep the serial first-occurrence ids
+    def test_matches_serial_scan(self):
+        engines = [e for e in ENGINES if e != "numpy" or np is not None]
+        for engine in engines:
+            serial = Scanner(self.SRC, engine=engine)
+            expected = list(serial.tokens())
+            for size in (5, 37, 500):
+                with self.subTest(engine=engine, chunk_size=size):
+                    scanner = Scanner(None, engine=engine)
+                    tokens = list(scanner.parallel_tokens(self.pool, self.chunks(size), 3))
+                    self.assertEqual(tokens, expected)
+                    self.assertEqual(scanner.symbol_entry, serial.symbol_entry)
+
+    def test_shared_table_and_classify_only(self):
+        shared = SymbolTable(["gamma", "zeta"])
+        serial = list(Scanner(self.SRC, symbols=SymbolTable(["gamma", "zeta"])).tokens())
+        scanner = Scanner(None, symbols=shared)
+        self.assertEqual(list(scanner.parallel_tokens(self.pool, self.chunks(64))), serial)
+
+        scanner = Scanner(None, track_symbols=False)
+        tokens = list(scanner.parallel_tokens(self.pool, self.chunks(64)))
+        self.assertEqual(tokens, list(Scanner(self.SRC, track_symbols=False).tokens()))
+
+    # Remapped arrays feed the parser without building Tokens
+    def test_segments_to_parser_tokens(self):
+        scanner = Scanner(None)
+        segments = list(scanner.parallel_segments(self.pool, self.chunks(37), 3))
+        self.assertTrue(all(isinstance(s[1], array) for s in segments))
+        expected = list(tokens_desde_scanner(Scanner(self.SRC)))
+        self.assertEqual(list(tokens_de_segmentos(segments)), expected)
+        self.assertEqual(list(tokens_desde_scanner(Scanner(self.SRC, workers=2))), expected)
+
+    def test_workers_option(self):
+        out = []
+        scanner = Scanner(self.SRC, emit=out.append, workers=2)
+        scanner.scan()
+        self.assertEqual(out, [str(t) for t in Scanner(self.SRC).tokens()])
+        self.assertEqual(len(scanner.symbol_entry), 7)
+
+
+class BinaryFormatTests(unittest.TestCase):
+
+    def binary(self, text, symbols=True):
+        scanner = Scanner(text)
+        buf = io.BytesIO()
+        if symbols:
+            scanner.scan_binary(buf)
+        else:
+            write_binary(scanner.tokens(), buf)
+        return buf.getvalue()
+
+    # Binary and text output decode to the same parser tokens
+    def test_round_trip(self):
+        src = "class A { b ( c ) { d } } " + " ".join(f"x{i}" for i in range(300))
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            Scanner(src).scan()
+        expected = list(TokenParser(buf.getvalue()).parse_scanner_output())
+        for symbols in (True, False):
+            with self.subTest(symbols=symbols):
+                data = self.binary(src, symbols)
+                self.assertEqual(list(TokenParser(data).iter_tokens()), expected)
+                self.assertEqual(list(TokenParser(memoryview(data)).iter_tokens()),
+                                 expected)
+
+    # One byte per punctuation token, two for a small identifier id
+    def test_compact(self):
+        data = self.binary("class A { b }", symbols=False)
+        self.assertEqual(data, BINARY_HEADER + bytes((7, 20, 1, 3, 20, 2, 4)))
+
+    def test_bad_header(self):
+        with self.assertRaises(ValueError):
+            list(TokenParser(b"XXXX\x01\x00\x07").iter_tokens())
+
+    def test_classify_binary_file(self):
+        fd, path = tempfile.mkstemp(suffix=".tok")
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.binary("class A { b ( c ) { d } }"))
+        self.addCleanup(os.remove, path)
+        self.assertTrue(es_salida_binaria(path))
+        self.assertEqual(clasificar_desde_scanner(path),
+                         classify("class A { b ( c ) { d } }"))
+
+
+class ParserStreamTests(unittest.TestCase):
+
+    # The parser pulls tokens lazily from any iterator
+    def test_pulls_from_generator(self):
+        pulled = []
+
+        def stream():
+            for token in [(CLASS, 0), (ID, 1), (LBRACE, 0), (ID, 2), (RBRACE, 0)]:
+                pulled.append(token)
+                yield token
+
+        parser = RecursiveDescentParser(stream())
+        self.assertEqual(len(pulled), 1)
+        self.assertEqual(parser.parse(), ("OOP", 90, 100.0))
+        self.assertEqual(parser.tokens_total, 5)
+
+    # Tokens left after the parse stops still count towards the total
+    def test_counts_unparsed_tail(self):
+        tokens = [(ID, 1), (RBRACE, 0), (ID, 2), (ID, 3)]
+        parser = RecursiveDescentParser(iter(tokens))
+        parser.parse()
+        self.assertEqual(parser.tokens_total, 4)
+        self.assertEqual(parser.calcular_porcentaje_lectura(), 25.0)
+
+
+class TokenStoreTests(unittest.TestCase):
+
+    # Text output is stored as parallel arrays of integer kinds and ids
+    def test_from_scanner_output(self):
+        store = TokenParser("<7>\n<20, 1>\n<3>\n<20, 300>\n<4>\n"
+                            "Symbol Table:\nA: 1\n").parse_scanner_output()
+        self.assertIsInstance(store, TokenStore)
+        self.assertEqual(list(store.kinds), [CLASS, ID, LBRACE, ID, RBRACE])
+        self.assertEqual(list(store.symbols), [0, 1, 0, 300, 0])
+        self.assertEqual(store[3], (ID, 300))
+        self.assertEqual(len(store), 5)
+
+    def test_parse_store(self):
+        src = "class A { b ( c ) { d } } e f"
+        store = TokenStore(tokens_desde_scanner(Scanner(src)))
+        self.assertEqual(RecursiveDescentParser(store).parse(), classify(src))
+
+
+class SamplingTests(unittest.TestCase):
+
+    SRC = "f ( a ) { b } " * 2000
+
+    def test_max_tokens(self):
+        for engine in PARSER_ENGINES:
+            with self.subTest(engine=engine):
+                store = TokenStore(tokens_desde_scanner(Scanner(self.SRC)))
+                parser = RecursiveDescentParser(store, engine, max_tokens=700)
+                paradigm, _, read = parser.parse()
+                self.assertTrue(parser.muestreado)
+                self.assertEqual(parser.tokens_total, 700)
+                self.assertEqual(paradigm, "PP")
+                self.assertEqual(read, round(700 / len(store) * 100, 1))
+
+    # Stops once the result has been stable for the window
+    def test_stable_window(self):
+        result = classify(self.SRC, muestreo=Muestreo(ventana=400))
+        self.assertEqual(result.paradigm, classify(self.SRC).paradigm)
+        self.assertLess(result.read, 10.0)
+
+        # A change of paradigm inside the window is still seen
+        late = "f ( a ) { b } " * 40 + "class A { x }"
+        self.assertEqual(classify(late, muestreo=Muestreo(ventana=400)), classify(late))
+
+    # Read % is scaled by the part of the input that was analysed
+    def test_prefix(self):
+        result = classify(self.SRC, muestreo=Muestreo(max_chars=len(self.SRC) // 4))
+        self.assertEqual(result.paradigm, "PP")
+        self.assertAlmostEqual(result.read, 25.0, delta=0.5)
+        chunks = read_chunks(io.StringIO(self.SRC), 100)
+        self.assertEqual(
+            classify(chunks, muestreo=Muestreo(max_chars=len(self.SRC) // 4),
+                     total_chars=len(self.SRC)), result)
+
+    # Files are measured in bytes on both sides of the fraction
+    def test_non_ascii_file(self):
+        src = "f ( ñandú ) { é }\r\n" * 2000
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "big.src")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(src)
+            sampling = Muestreo(ventana=400)
+            self.assertEqual(ejecutar_analisis_completo(path, muestreo=sampling),
+                             classify(src, muestreo=sampling))
+            sampling = Muestreo(max_chars=len(src) // 2)
+            result = ejecutar_analisis_completo(path, muestreo=sampling)
+            self.assertEqual(result, classify(src, muestreo=sampling))
+            self.assertAlmostEqual(result.read, 50.0, delta=0.5)
+
+    # --max-kb cuts files by bytes, the unit their progress is measured in
+    def test_byte_prefix(self):
+        src = "f ( a ) { b }\n" * 2000 + "f ( \u00f1 ) { \u00e9 }\n" * 2000
+        size = len(src.encode("utf-8"))
+        sampling = Muestreo(max_bytes=size // 2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "big.src")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(src)
+            result = ejecutar_analisis_completo(path, muestreo=sampling)
+        self.assertAlmostEqual(result.read, 50.0, delta=0.5)
+        self.assertEqual(classify(src, muestreo=sampling), result)
+
+    def test_short_input_unchanged(self):
+        src = "class A { f ( ) { } }"
+        sampling = Muestreo(max_tokens=1000, ventana=100, max_chars=1000)
+        self.assertEqual(classify(src, muestreo=sampling), classify(src))
+
+
+class PanicRecoveryTests(unittest.TestCase):
+
+    def run_panic(self, src, max_errores=None):
+        parser = RecursiveDescentParser(tokens_desde_scanner(Scanner(src)),
+                                        recovery="panic", max_errores=max_errores)
+        return parser.parse(), parser
+
+    def test_valid_input_unchanged(self):
+        for src in ["a ( b ) { c } d", "class A { id x }", "f ( a ) " * 50]:
+            with self.subTest(source=src):
+                result, parser = self.run_panic(src)
+                self.assertEqual(result, classify(src))
+                self.assertEqual(parser.errores_sintacticos, 0)
+
+    # Every error consumes a token or pops a symbol: the whole stream is
+    # reached, but discarded tokens do not count as read
+    def test_progress_on_garbage(self):
+        rng = random.Random(7)
+        alphabet = ["class", "x", "(", ")", "{", "}"]
+        sources = [") ( " * 5000, "} " * 3000 + "f ( a ) { b }",
+                   " ".join(rng.choice(alphabet) for _ in range(20000))]
+        for src in sources:
+            with self.subTest(source=src[:20]):
+                result, parser = self.run_panic(src)
+                self.assertEqual(parser.position, parser.tokens_total)
+                self.assertLessEqual(parser.errores_sintacticos, 2 * parser.tokens_total + 1)
+                self.assertGreater(parser.tokens_descartados, 0)
+                parsed = parser.tokens_total - parser.tokens_descartados
+                self.assertEqual(result[2], round(parsed / parser.tokens_total * 100, 1))
+                self.assertLess(result[2], 100.0)
+
+    # Unlike best_match, recovery keeps going after the third error
+    def test_recovers_past_errors(self):
+        src = "} } } } f ( a ) { b } g ( ) { c }"
+        best = RecursiveDescentParser(tokens_desde_scanner(Scanner(src))).parse()
+        result, parser = self.run_panic(src)
+        self.assertEqual(best[2], 0.0)
+        self.assertEqual(result[0], "PP")
+        self.assertEqual(parser.funciones_encontradas, 2)
+
+    def test_error_budget(self):
+        src = "} " * 100 + "f ( a ) { b }"
+        result, parser = self.run_panic(src, max_errores=5)
+        self.assertTrue(parser.presupuesto_agotado)
+        self.assertEqual(parser.errores_sintacticos, 6)
+        self.assertLess(result[2], 10.0)
+        self.assertEqual(classify(src, recuperacion=Recuperacion("panic", 5)),
+                         Result(*result))
+
+    def test_options(self):
+        self.assertEqual(RECOVERY_MODES, ("best_match", "panic"))
+        with self.assertRaises(ValueError):
+            RecursiveDescentParser([], recovery="skip")
+        with self.assertRaises(ValueError):
+            RecursiveDescentParser([], engine="recursive", recovery="panic")
+
+
+class FastPathTests(unittest.TestCase):
+
+    def parse(self, tokens):
+        return RecursiveDescentParser(tokens).parse()
+
+    # Accepted inputs give exactly the parser's result
+    def test_matches_parser(self):
+        sources = [generar(name, 2000, 3) for name in CORPUS if name != "malformed"]
+        sources += ["class A { }", "a b { c } d ( e ) f", "x y ( z ) { w }",
+                    "f ( ) class B { g ( h ) { } }"]
+        for src in sources:
+            with self.subTest(source=src[:30]):
+                store = TokenStore(tokens_desde_scanner(Scanner(src)))
+                contador = ContadorRapido(store)
+                self.assertTrue(contador.contar())
+                self.assertEqual(contador.clasificar_mejor_match(), self.parse(store))
+                self.assertEqual(classify(src), classify(src, rapido=False))
+
+    def test_random_token_streams(self):
+        rng = random.Random(11)
+        kinds = [CLASS, FUNC, ID, LPAREN, RPAREN, LBRACE, RBRACE]
+        for _ in range(20000):
+            tokens = [(rng.choice(kinds), 0) for _ in range(rng.randint(1, 12))]
+            contador = ContadorRapido(tokens)
+            if contador.contar():
+                self.assertEqual(contador.clasificar_mejor_match(), self.parse(tokens), tokens)
+
+    # Malformed input falls back to the parser with the whole stream
+    def test_fallback(self):
+        src = "class A { b ( } ) c d"
+        store = TokenStore(tokens_desde_scanner(Scanner(src)))
+        contador = ContadorRapido(iter(store))
+        self.assertFalse(contador.contar())
+        self.assertEqual(list(contador.resto()), list(store))
+        self.assertEqual(classify(src), classify(src, rapido=False))
+        self.assertEqual(classify(generar("malformed", 500, 1)),
+                         classify(generar("malformed", 500, 1), rapido=False))
+
+    def test_buffer_limit(self):
+        store = TokenStore(tokens_desde_scanner(Scanner("f ( a ) { b } " * 3)))
+        contador = ContadorRapido(iter(store), limite=4)
+        self.assertFalse(contador.contar())
+        self.assertEqual(list(contador.resto()), list(store))
+
+        contador = ContadorRapido(iter(store), limite=4, releible=True)
+        self.assertTrue(contador.contar())
+        self.assertIsNone(contador.resto())
+        self.assertEqual(contador.clasificar_mejor_match(), self.parse(store))
+
+    # Input that fails late keeps at most LIMITE_BUFFER_RAPIDO tokens
+    def test_peak_memory(self):
+        unit = "f ( a ) { b } " * 1000
+        src = unit * 16 + ")"
+        inputs = {"str": lambda: src,
+                  "chunks": lambda: itertools.chain([unit] * 16, [")"])}
+        for name, make_input in inputs.items():
+            with self.subTest(input=name):
+                text = make_input()
+                tracemalloc.start()
+                try:
+                    result = classify(text)
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                self.assertEqual(result, classify(src, rapido=False))
+                self.assertLess(peak, LIMITE_BUFFER_RAPIDO * 6)
+
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class BatchScoringTests(unittest.TestCase):
+
+    def scalar(self, contadores):
+        puntuacion = Puntuacion()
+        (puntuacion.best_match_clases, puntuacion.best_match_funciones,
+         puntuacion.best_match_tokens_procesados, puntuacion.tokens_programacion_validos,
+         puntuacion.errores_sintacticos, puntuacion.tokens_total,
+         puntuacion.best_match_position, _) = contadores
+        puntuacion.position = puntuacion.tokens_descartados = 0
+        puntuacion.muestreado = False
+        puntuacion.avance = None
+        return puntuacion.clasificar_mejor_match()
+
+    # Same results as the scalar path, including rounding ties
+    def test_matches_scalar(self):
+        rng = random.Random(5)
+        contadores = []
+        for _ in range(5000):
+            total = rng.choice([0, 1, 3, 7, 10, 40, rng.randint(1, 10 ** 6)])
+            contadores.append(Contadores(
+                rng.choice([0, 0, 1, rng.randint(0, 50)]),
+                rng.choice([0, 0, 1, rng.randint(0, 50)]),
+                rng.randint(0, total), rng.randint(0, total), rng.randint(0, 20),
+                total, rng.randint(0, total)))
+        self.assertEqual(resultados(contadores), [self.scalar(c) for c in contadores])
+
+    # Counters collected from real parses, sampled ones included
+    def test_parsed_counters(self):
+        sources = [generar(name, 300, seed) for name in CORPUS for seed in (1, 2)]
+        sources += ["", "class A { b ( } ) c d", ") ( " * 10]
+        contadores, esperados = [], []
+        for src in sources:
+            for muestreo in (None, 50):
+                parser = RecursiveDescentParser(
+                    TokenStore(tokens_desde_scanner(Scanner(src))), max_tokens=muestreo)
+                esperados.append(parser.parse())
+                contadores.append(parser.contadores())
+        self.assertEqual(resultados(contadores), esperados)
+
+    def test_columns(self):
+        paradigms, certainties, read = puntuar_lote({
+            "clases": [1, 0], "funciones": [1, 0], "procesados": [4, 0],
+            "programacion": [4, 0], "errores": [0, 0], "total": [4, 0], "leidos": [4, 0],
+        })
+        self.assertEqual(paradigms.tolist(), ["HYB", "TEXT"])
+        self.assertEqual(certainties.tolist(), [82, 90])
+        self.assertEqual(read.tolist(), [100.0, 100.0])
+        self.assertEqual(resultados([]), [])
+
+    # Empty input scores the same in every path
+    def test_empty_input(self):
+        parser = RecursiveDescentParser(tokens_desde_scanner(Scanner("")))
+        self.assertEqual(parser.parse(), classify(""))
+        self.assertEqual(resultados([parser.contadores()]), [classify("")])
+        self.assertEqual(classify("", rapido=False), classify(""))
+
+
+class IterativeParserTests(unittest.TestCase):
+
+    COUNTERS = [
+        "position", "tokens_total", "clases_encontradas",
+        "funciones_encontradas", "tokens_programacion_validos",
+        "tokens_procesados_exitosamente", "errores_sintacticos",
+        "best_match_position", "best_match_clases", "best_match_funciones",
+        "best_match_tokens_procesados", "recovery_attempts",
+    ]
+
+    def run_parser(self, src, engine):
+        parser = RecursiveDescentParser(tokens_desde_scanner(Scanner(src)), engine)
+        result = parser.parse()
+        return result, [getattr(parser, name) for name in self.COUNTERS]
+
+    # Same counters and result as the recursive procedures
+    def test_matches_recursive(self):
+        sources = [
+            "", "class A { id x }", "a ( b ) { c } d ( ) e f ( g ) { h }",
+            "class { } id x }", ") ( class", "a b ( c ) d", "class A { b } }",
+            "x { y } ( z ) { w }", "class A { f ( ) { } }",
+            open("text_example.txt", encoding="utf-8").read(),
+        ]
+        for src in sources:
+            with self.subTest(source=src):
+                self.assertEqual(self.run_parser(src, "iterative"),
+                                 self.run_parser(src, "recursive"))
+
+    # Deep nesting and long flat lists no longer hit RecursionError
+    def test_deep_input(self):
+        nested = "class A { " * 5000 + "x" + " }" * 5000
+        flat = "f ( a ) " * 5000
+        words = "w " * 20000
+        with self.assertRaises(RecursionError):
+            self.run_parser(nested, "recursive")
+        self.assertEqual(self.run_parser(nested, "iterative")[0], ("OOP", 90, 100.0))
+        self.assertEqual(self.run_parser(flat, "iterative")[0], ("PP", 90, 100.0))
+        self.assertEqual(self.run_parser(words, "iterative")[0][0], "TEXT")
+
+    def test_unknown_engine(self):
+        self.assertEqual(PARSER_ENGINES, ("iterative", "recursive"))
+        with self.assertRaises(ValueError):
+            RecursiveDescentParser([], engine="lalr")
+
+
+class GrammarTests(unittest.TestCase):
+
+    # Generated sets agree with the ones documented in the procedures
+    def test_first_follow(self):
+        g = GRAMATICA_CLASIFICADOR
+        self.assertEqual(g.first["S"], {"class", "fn", "id"})
+        self.assertEqual(g.first["DCL''"], {"(", "id", "{", "ε"})
+        self.assertEqual(g.follow["S'"], {"$", "}"})
+        self.assertEqual(g.follow["DCL'"], {"class", "fn", "id", "$", "}"})
+        self.assertEqual(g.follow["TEXT"], {")", "(", "{", "class", "fn", "id", "$", "}"})
+
+    # LL(1) conflicts go to the earlier alternative, like the if/elif chain
+    def test_conflicts_prefer_first_alternative(self):
+        g = GRAMATICA_CLASIFICADOR
+        self.assertIn(("DCL''", "("), g.conflictos)
+        self.assertEqual(g.tabla["DCL''"]["("][1], "(")
+        self.assertEqual(g.tabla["TEXT"]["id"], ("id", "TEXT'"))
+        self.assertEqual(g.tabla["TEXT"][")"], ())
+        self.assertNotIn(")", g.tabla["DCL'"])
+
+    def test_small_grammar(self):
+        g = Gramatica((("S", ("(", "S", ")")), ("S", ())), "S")
+        self.assertEqual(g.first["S"], {"(", "ε"})
+        self.assertEqual(g.follow["S"], {"$", ")"})
+        self.assertEqual(g.conflictos, [])
+
+
+class BatchTests(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        os.mkdir(os.path.join(self.root, "sub"))
+        self.files = {
+            "a.txt": "class A { id x }",
+            os.path.join("sub", "b.txt"): "f ( a ) { b }",
+            os.path.join("sub", "c.log"): "plain words",
+        }
+        for name, content in self.files.items():
+            with open(os.path.join(self.root, name), "w", encoding="utf-8") as f:
+                f.write(content)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def test_expand_inputs(self):
+        listing = self.path("list.lst")
+        with open(listing, "w", encoding="utf-8") as f:
+            f.write(self.path("a.txt") + "\n\n")
+        self.assertEqual(
+            list(expandir_entradas([self.path("sub"), "@" + listing,
+                                    self.path("**/*.txt")])),
+            [self.path("sub/b.txt"), self.path("sub/c.log"), self.path("a.txt"),
+             self.path("a.txt"), self.path("sub/b.txt")])
+
+    # Worker tables are merged into one dump per batch
+    def test_batch_symbol_dump(self):
+        paths = [self.path(name) for name in self.files]
+        dump = self.path("batch.sym")
+        list(clasificar_lote(paths, workers=2, ruta_simbolos=dump))
+        self.assertEqual(set(SymbolTable.load(dump)), {"A", "id", "x", "f", "a", "b",
+                                                       "plain", "words"})
+        self.assertEqual(sorted(os.listdir(self.root)), ["a.txt", "batch.sym", "sub"])
+        # Cache hits are never scanned, so the two cannot be combined
+        with self.assertRaises(ValueError):
+            list(clasificar_lote(paths, ruta_cache=self.path("cache.db"), ruta_simbolos=dump))
+
+    def test_batch_in_pool(self):
+        paths = [self.path(name) for name in self.files] + [self.path("missing")]
+        records = {r["path"]: r for r in clasificar_lote(paths, workers=2)}
+        self.assertEqual(set(records), set(paths))
+        self.assertEqual(records[self.path("a.txt")]["paradigm"], "OOP")
+        self.assertEqual(records[self.path("sub/b.txt")]["paradigm"], "PP")
+        self.assertEqual(records[self.path("sub/c.log")]["paradigm"], "TEXT")
+        self.assertIn("FileNotFoundError", records[self.path("missing")]["error"])
+        self.assertTrue(all("elapsed" in r for r in records.values()))
+
+    # A killed worker fails only the files in flight; the batch goes on
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "needs named pipes")
+    def test_killed_worker(self):
+        blocked = self.path("blocked.fifo")
+        os.mkfifo(blocked)  # opening it blocks the worker until it is killed
+        before = set(multiprocessing.active_children())
+        paths = [self.path(name) for name in self.files]
+
+        def inputs():
+            yield blocked
+            time.sleep(0.2)
+            for child in set(multiprocessing.active_children()) - before:
+                os.kill(child.pid, signal.SIGKILL)
+            time.sleep(0.3)
+            yield from paths
+
+        records = {r["path"]: r for r in clasificar_lote(inputs(), workers=1)}
+        self.assertIn("BrokenProcessPool", records[blocked]["error"])
+        self.assertEqual([records[path]["paradigm"] for path in paths], ["OOP", "PP", "TEXT"])
+        self.assertTrue(all("elapsed" in r for r in records.values()))
+
+    # Files past the fast-path buffer are read again instead of buffered
+    def test_large_file(self):
+        src = "f ( a ) { b } " * (LIMITE_BUFFER_RAPIDO // 7 + 1)
+        for tail in ("", ")"):
+            with self.subTest(tail=tail):
+                big = self.path("big.txt")
+                with open(big, "w", encoding="utf-8") as f:
+                    f.write(src + tail)
+                record = clasificar_archivo(big)
+                self.assertEqual((record["paradigm"], record["certainty"], record["read"]),
+                                 tuple(classify(src + tail, rapido=False)))
+
+    # Workers share one on-disk cache; the second run is served from it
+    def test_batch_with_cache(self):
+        cache = self.path("cache.db")
+        paths = [self.path(name) for name in self.files]
+        first = {r["path"]: r for r in clasificar_lote(paths, 2, None, cache)}
+        second = {r["path"]: r for r in clasificar_lote(paths, 2, None, cache)}
+        for path in paths:
+            self.assertEqual(first[path]["paradigm"], second[path]["paradigm"])
+        with ResultCache(cache) as opened:
+            self.assertEqual(opened.obtener(opened.clave(paths[0])).paradigm, "OOP")
+
+    # Undecodable files are reported as errors and never cached
+    def test_undecodable_file_is_an_error(self):
+        bad = self.path("bad.bin")
+        with open(bad, "wb") as f:
+            f.write(b"\xff\xfe" + b"class A { b } " * 10)
+        cache = self.path("cache.db")
+        record = clasificar_archivo(bad, ruta_cache=cache)
+        self.assertIn("UnicodeDecodeError", record["error"])
+        self.assertNotIn("paradigm", record)
+        with ResultCache(cache) as opened:
+            self.assertIsNone(opened.obtener(opened.clave(bad)))
+
+    @unittest.skipUnless(hasattr(signal, "setitimer"), "needs SIGALRM")
+    def test_timeout_is_reported(self):
+        big = self.path("big.txt")
+        with open(big, "w", encoding="utf-8") as f:
+            f.write("class A { f ( x ) { y } } " * 200000)
+        record = clasificar_archivo(big, timeout=0.01)
+        self.assertTrue(record["error"].startswith("TiempoAgotado"))
+
+
+class BenchmarkTests(unittest.TestCase):
+
+    # The same seed always yields the same corpus
+    def test_corpus_is_seeded(self):
+        for name in CORPUS:
+            with self.subTest(corpus=name):
+                self.assertEqual(generar(name, 300, seed=1), generar(name, 300, seed=1))
+                self.assertNotEqual(generar(name, 300, seed=1), generar(name, 300, seed=2))
+
+    def test_corpus_paradigms(self):
+        expected = {"nested_classes": "OOP", "flat_functions": "PP", "prose": "TEXT"}
+        for name, paradigm in expected.items():
+            with self.subTest(corpus=name):
+                self.assertEqual(classify(generar(name, 500)).paradigm, paradigm)
+
+    def test_report(self):
+        report = medir_corpus("malformed", 200, seed=0, repeticiones=1, engines=["dfa"])
+        self.assertEqual(report["tokens"], report["scan"]["dfa"]["tokens"])
+        self.assertEqual(set(report["parse"]), set(PARSER_ENGINES))
+        self.assertGreater(report["peak_memory_bytes"], 0)
+        self.assertNotIn("parallel", report)
+
+        report = medir_corpus("malformed", 200, seed=0, repeticiones=1, engines=["dfa"],
+                              workers=2)
+        self.assertEqual(report["parallel"]["workers"], 2)
+
+
+class ServerTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        cls.root = tmp.name
+        cls.socket = os.path.join(tmp.name, "server.sock")
+        cls.server = crear_servidor(socket_unix=cls.socket, workers=1)
+        thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        thread.start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+    def ask(self, request):
+        return consultar(request, socket_unix=self.socket)
+
+    # Same line as `python syntax_analyzer.py <file>`
+    def test_path_request(self):
+        path = os.path.join(self.root, "code.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("class A { f ( x ) { y } }")
+        response = self.ask({"path": path, "id": 3})
+        self.assertEqual(response["id"], 3)
+        self.assertEqual(linea_resultado(response),
+                         "{} {} {}".format(*clasificar_ruta(path)))
+
+    def test_text_request(self):
+        response = self.ask({"text": "f ( a ) { b }", "engine": "re"})
+        self.assertEqual((response["paradigm"], response["certainty"], response["read"]),
+                         tuple(classify("f ( a ) { b }")))
+
+    def test_errors(self):
+        self.assertIn("FileNotFoundError", self.ask({"path": "/missing/file"})["error"])
+        self.assertIn("error", self.ask({"text": "x", "engine": "lalr"}))
+        self.assertIn("error", self.ask({"other": 1}))
+        # Decoding fails after the format sniff, inside the analysis
+        bad = os.path.join(self.root, "bad.txt")
+        with open(bad, "wb") as f:
+            f.write(b"class A { b } " * 20 + b"\xff\xfe")
+        self.assertIn("UnicodeDecodeError", self.ask({"path": bad})["error"])
+        # Scanner output goes through the same strict path
+        with open(bad, "wb") as f:
+            f.write(b"<7>\n<20, 1>\n" * 2000 + b"\xff\xfe")
+        self.assertIn("UnicodeDecodeError", self.ask({"path": bad})["error"])
+        with open(bad, "wb") as f:
+            f.write(BINARY_MAGIC + b"\x09\x00")
+        self.assertIn("ValueError", self.ask({"path": bad})["error"])
+        self.assertEqual(clasificar_desde_scanner(bad), ("TEXT", 80, 100.0))
+        self.assertEqual(linea_resultado({"error": "x"}), "Error al procesar el archivo")
+
+    def test_tcp_address(self):
+        self.assertEqual(direccion_tcp("9000"), ("127.0.0.1", 9000))
+        self.assertEqual(direccion_tcp("localhost:9000"), ("localhost", 9000))
+
+
+class AsyncClassifyTests(unittest.IsolatedAsyncioTestCase):
+
+    SOURCES = ["class A { b }", "f ( a ) { b }", "plain words", "class A { f ( ) }"]
+
+    async def collect(self, items, **kwargs):
+        return [pair async for pair in classify_many(items, **kwargs)]
+
+    async def test_texts(self):
+        results = dict(await self.collect(self.SOURCES, concurrency=2, texts=True))
+        self.assertEqual(results, {src: classify(src) for src in self.SOURCES})
+
+    async def test_paths_and_process_pool(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        paths = []
+        for i, src in enumerate(self.SOURCES):
+            paths.append(os.path.join(tmp.name, f"{i}.txt"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(src)
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            results = dict(await self.collect(paths, executor=pool))
+        self.assertEqual(results, {p: classify(s) for p, s in zip(paths, self.SOURCES)})
+
+        # Mixed input: PathLike entries are files, str entries are code
+        mixed = dict(await self.collect([Path(paths[0]), "x ( y )"], texts=True))
+        self.assertEqual(mixed[Path(paths[0])], classify(self.SOURCES[0]))
+
+    # Inputs are pulled only as in-flight slots free up
+    async def test_backpressure(self):
+        pulled = []
+
+        async def items():
+            for src in self.SOURCES * 5:
+                pulled.append(src)
+                yield src
+
+        stream = classify_many(items(), concurrency=2, texts=True)
+        await stream.__anext__()
+        self.assertLessEqual(len(pulled), 3)
+        await stream.aclose()
+
+    async def test_errors(self):
+        with self.assertRaises(FileNotFoundError):
+            await self.collect(["/missing/file"])
+        [(_, error)] = await self.collect(["/missing/file"], return_exceptions=True)
+        self.assertIsInstance(error, FileNotFoundError)
+        with self.assertRaises(ValueError):
+            await self.collect([], concurrency=0)
+
+
+class ResultCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.cache = ResultCache(os.path.join(self.root, "cache.db"))
+        self.addCleanup(self.cache.close)
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    # A hit is served without running the classifier again
+    def test_hit_skips_classifier(self):
+        calls = []
+
+        def classifier(path):
+            calls.append(path)
+            return ejecutar_analisis_completo(path)
+
+        a = self.write("a.txt", "class A { id x }")
+        b = self.write("b.txt", "class A { id x }")  # same content, same key
+        self.assertEqual(self.cache.clasificar(a, classifier), ("OOP", 90, 100.0))
+        self.assertEqual(self.cache.clasificar(b, classifier), ("OOP", 90, 100.0))
+        self.assertEqual(calls, [a])
+
+        self.write("a.txt", "f ( x ) { y }")
+        self.assertEqual(self.cache.clasificar(a, classifier).paradigm, "PP")
+        self.assertEqual(len(calls), 2)
+
+    def test_front_of_analysis(self):
+        path = self.write("a.txt", "class A { id x }")
+        self.assertEqual(ejecutar_analisis_completo(path, self.cache), ("OOP", 90, 100.0))
+        self.assertIsNotNone(self.cache.obtener(self.cache.clave(path)))
+
+    def test_tokens_are_optional(self):
+        path = self.write("a.txt", "class A { b }")
+        self.cache.clasificar(path, ejecutar_analisis_completo, tokens_de_archivo)
+        self.assertEqual(self.cache.tokens(self.cache.clave(path)),
+                         "<7>\n<20, 1>\n<3>\n<20, 2>\n<4>")
+
+    # The same file read as code and as scanner output has two entries
+    def test_key_includes_classifier_kind(self):
+        path = self.write("tokens.txt", "<7>\n<20, 1>\n<3>\n<20, 2>\n<4>")
+        cache = os.path.join(self.root, "cache.db")
+        self.assertEqual(clasificar_archivo(path, ruta_cache=cache)["paradigm"], "TEXT")
+        self.assertEqual(clasificar_ruta(path, self.cache), ("OOP", 90, 100.0))
+        self.assertNotEqual(self.cache.clave(path), self.cache.clave(path, "tokens"))
+        with self.assertRaises(ValueError):
+            self.cache.clave(path, "binary")
+
+    # Fallback results are returned but never cached
+    def test_fallbacks_not_cached(self):
+        bad = os.path.join(self.root, "bad.txt")
+        with open(bad, "wb") as f:
+            f.write(b"class A { b } " * 3000 + b"\xff\xfe")
+        self.assertEqual(ejecutar_analisis_completo(bad, self.cache), ("TEXT", 75, 100.0))
+        self.assertIsNone(self.cache.obtener(self.cache.clave(bad)))
+
+        with open(bad, "wb") as f:
+            f.write(BINARY_MAGIC + b"\x09\x00")
+        self.assertEqual(clasificar_desde_scanner(bad, self.cache), ("TEXT", 80, 100.0))
+        self.assertIsNone(self.cache.obtener(self.cache.clave(bad, "tokens")))
+
+    # A broken cache classifies without it
+    def test_cache_failure(self):
+        path = self.write("a.txt", "class A { id x }")
+        tokens = self.write("tokens.txt", "<7>\n<20, 1>\n<3>\n<20, 2>\n<4>")
+        self.cache.close()
+        self.assertEqual(clasificar_ruta(path, self.cache), ("OOP", 90, 100.0))
+        self.assertEqual(ejecutar_analisis_completo(path, self.cache), ("OOP", 90, 100.0))
+        self.assertEqual(clasificar_desde_scanner(tokens, self.cache), ("OOP", 90, 100.0))
+
+    def test_least_recently_used_evicted(self):
+        self.cache.max_entradas = 2
+        for key in ("k1", "k2", "k3"):
+            self.cache.guardar(key, Result("TEXT", 90, 100.0))
+        self.cache.obtener("k1")
+        self.cache.descartar()
+        self.assertIsNotNone(self.cache.obtener("k1"))
+        self.assertIsNone(self.cache.obtener("k2"))
+        self.assertIsNotNone(self.cache.obtener("k3"))
+
+
+class ClassifyTests(unittest.TestCase):
+
+    # In‑memory pipeline: no subprocess and no output.txt
+    def test_paradigms(self):
+        cases = {
+            "class A { id x }": "OOP",
+            "id f ( id a ) { id b }": "PP",
+            "class A { id f ( ) { id b } } id g ( ) { id c }": "HYB",
+            "just some words here": "TEXT",
+        }
+        for src, paradigm in cases.items():
+            with self.subTest(source=src):
+                self.assertEqual(classify(src).paradigm, paradigm)
+
+    def test_empty_input(self):
+        self.assertEqual(classify(""), Result("TEXT", 90, 100.0))
+
+    def test_result_is_a_tuple(self):
+        paradigma, certeza, lectura = classify("class A { id x }")
+        self.assertEqual((paradigma, certeza, lectura), ("OOP", 90, 100.0))
+
+    # Invalid UTF-8 is a read error whatever the file size, as at the CLI
+    def test_undecodable_source(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in (1, 3000):
+                path = os.path.join(tmp, f"bad{size}.txt")
+                with open(path, "wb") as f:
+                    f.write(b"class A { b } " * size + b"\xff\xfe")
+                with self.subTest(size=size):
+                    with self.assertRaises(UnicodeDecodeError):
+                        clasificar_ruta(path)
+                    out = io.StringIO()
+                    argv = sys.argv
+                    sys.argv = ["syntax_analyzer.py", path]
+                    try:
+                        with redirect_stdout(out):
+                            syntax_analyzer.main()
+                    finally:
+                        sys.argv = argv
+                    self.assertEqual(out.getvalue(), "Error al procesar el archivo\n")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file